@@ -0,0 +1,5 @@
+"""OpenAI model facts shared by the decomposition scripts (step2, step4, ai-decompose)."""
+
+# model snapshots that predate response_format={"type": "json_object"}
+LEGACY_JSON_MODELS = ("gpt-3.5-turbo-0301", "gpt-3.5-turbo-0613",
+                      "gpt-4-0314", "gpt-4-0613")
@@ -0,0 +1,90 @@
+"""GraphQL transport and project/repository id cache shared by ai-decompose and create-tickets-2."""
+
+import os
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict
+import requests
+from _jsonio import dumps, loads
+
+MAX_429_RETRIES = 3
+GATEWAY_ERRORS = (502, 503, 504)  # retried for queries only: a mutation may already have applied
+
+# ---- ID cache (project / repository node ids rarely change) ----
+ID_CACHE_FILE = Path.home() / ".cache" / "owl-client-relationship" / "project_ids.json"
+# error paths of the lookups whose results are cached
+ID_LOOKUP_PATHS = (["user", "projectV2"], ["repository"])
+
+
+def _load_id_cache() -> Dict[str, str]:
+    try:
+        data = json.loads(ID_CACHE_FILE.read_text())
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+ID_CACHE: Dict[str, str] = _load_id_cache()
+
+
+def save_id_cache():
+    try:
+        ID_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ID_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(ID_CACHE, indent=2))
+        os.replace(tmp, ID_CACHE_FILE)
+    except Exception:
+        pass  # cache is best-effort
+
+
+def invalidate_id_cache():
+    """Drop cached ids (one of them was reported missing, so it may be stale)."""
+    ID_CACHE.clear()
+    try:
+        ID_CACHE_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _is_stale_id_error(err: Dict[str, Any]) -> bool:
+    # NOT_FOUND on a data alias (a missing issue, say) says nothing about the cached ids
+    if err.get("type") != "NOT_FOUND":
+        return False
+    path = err.get("path") or []
+    if path[:2] in ID_LOOKUP_PATHS:
+        return True
+    message = err.get("message", "")
+    return any(node_id in message for node_id in ID_CACHE.values())
+
+
+def gql_request(session: requests.Session, url: str, query: str,
+                variables: Dict[str, Any] | None = None, bucket=None,
+                read_only: bool | None = None, partial: bool = False) -> Dict[str, Any]:
+    """POST one GraphQL document. With `partial`, alias-level errors come back in the
+    response (next to the aliases that succeeded) instead of raising."""
+    # a gateway error on a mutation is not retried: GitHub often applies the write first
+    if read_only is None:
+        read_only = not query.lstrip().startswith("mutation")
+    payload = {"query": query, "variables": variables or {}}
+    for attempt in range(MAX_429_RETRIES + 1):
+        r = session.post(url, data=dumps(payload))
+        if r.status_code == 429 and attempt < MAX_429_RETRIES:
+            if bucket is not None:
+                bucket.penalize()
+            time.sleep(2 ** attempt)
+            continue
+        if read_only and r.status_code in GATEWAY_ERRORS and attempt < MAX_429_RETRIES:
+            time.sleep(0.5 * 2 ** attempt)
+            continue
+        break
+    try:
+        data = loads(r.content)
+    except Exception:
+        raise RuntimeError(f"Non-JSON response: {r.status_code} {r.text[:200]}")
+    if "errors" in data:
+        if any(_is_stale_id_error(e) for e in data["errors"]):
+            invalidate_id_cache()
+        if not (partial and data.get("data")):
+            raise RuntimeError(f"GraphQL errors: {data['errors']}")
+    return data
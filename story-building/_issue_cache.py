@@ -0,0 +1,62 @@
+"""On-disk ETag cache for single-issue REST GETs, shared by the notebook scripts.
+
+Each issue is stored as {etag, last_modified, body_json} under
+~/.cache/owl-client-relationship/issues/<owner>__<repo>/<number>.json. Later GETs send
+If-None-Match / If-Modified-Since; a 304 reuses the stored JSON and does not count against
+the primary rate limit.
+"""
+
+from __future__ import annotations
+import os
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import requests
+
+CACHE_DIR = Path.home() / '.cache' / 'owl-client-relationship' / 'issues'
+
+
+def _entry_path(repo_name: str, number: int) -> Path:
+    return CACHE_DIR / repo_name.replace('/', '__') / f'{number}.json'
+
+
+def _load_entry(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        entry = json.loads(path.read_text(encoding='utf-8'))
+        return entry if isinstance(entry, dict) and 'body_json' in entry else None
+    except Exception:
+        return None
+
+
+def _save_entry(path: Path, entry: Dict[str, Any]):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(entry), encoding='utf-8')
+        os.replace(tmp, path)
+    except Exception:
+        pass  # cache is best-effort
+
+
+def get_issue(session: requests.Session, repo_name: str,
+              number: int) -> Tuple[requests.Response, Optional[Dict]]:
+    """GET one issue with conditional headers; returns (response, issue JSON or None)."""
+    path = _entry_path(repo_name, number)
+    entry = _load_entry(path)
+    headers: Dict[str, str] = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    r = session.get(f'https://api.github.com/repos/{repo_name}/issues/{number}',
+                    headers=headers, timeout=30)
+    if r.status_code == 304 and entry:
+        return r, entry['body_json']
+    if r.status_code != 200:
+        return r, None
+    data = r.json()
+    if r.headers.get('ETag') or r.headers.get('Last-Modified'):
+        _save_entry(path, {'etag': r.headers.get('ETag'),
+                           'last_modified': r.headers.get('Last-Modified'),
+                           'body_json': data})
+    return r, data
@@ -0,0 +1,29 @@
+"""JSON helpers shared by the scripts: orjson when installed, stdlib json otherwise.
+
+`dumps` always returns compact UTF-8 bytes, the same bytes either way.
+"""
+
+from __future__ import annotations
+import sys
+import json
+from typing import Any
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_json_stdout(obj: Any):
+    """Write compact JSON straight to the stdout byte stream."""
+    sys.stdout.buffer.write(dumps(obj))
+    sys.stdout.buffer.write(b"\n")
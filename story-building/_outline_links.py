@@ -0,0 +1,233 @@
+"""Update outline.md checklist items with links to GitHub issues.
+
+Steps:
+ 1. Fetch all issues from the configured User Project V2 (issue number, title, url)
+ 2. Build a mapping Title -> Issue URL
+ 3. Parse `outline.md` and for each checklist bullet inside the mermaid block.
+
+The current outline uses a two-line node label pattern inside the mermaid block:
+
+        P1A["- [ ] Ontology Loading & Inspection  
+                [[notebooks/ontology_load_and_query.ipynb]]"]
+
+Notice the notebook link is on the next line and the first line ends with two spaces (Markdown line break).
+This script detects such two-line groups with one multiline regex over the whole outline text. If the task title matches an issue title and is not
+already linked, it becomes:
+
+        P1A["- [ ] [Ontology Loading & Inspection](https://github.com/.../issues/1)  
+                [[notebooks/ontology_load_and_query.ipynb]]"]
+
+Idempotency:
+    - Lines already containing a markdown link right after the checkbox (pattern `- [ ] [`) are skipped.
+    - Only exact (case sensitive) title matches are replaced.
+
+Environment variables:
+    GITHUB_TOKEN / GITHUB_TOKEN_FG  required
+    USERNAME                        default: alexanderwiebe
+    PROJECT_NUMBER                  default: 1
+    OUTLINE_FILE                    default: outline.md
+    DRY_RUN=1                       preview only
+
+This module holds the link pass; update_outline.py runs it (alone with --links-only, or the
+update_outline_links.py wrapper).
+
+Limitations:
+    - Exact title matching (no fuzzy search).
+    - Assumes notebook link is on the immediate following line beginning with optional spaces then `[[`.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import re
+from pathlib import Path
+from typing import Dict, Any, Iterable, List
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / '.env')
+
+USERNAME = os.getenv('USERNAME', 'alexanderwiebe')
+PROJECT_NUMBER = int(os.getenv('PROJECT_NUMBER', '1'))
+TOKEN = os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_TOKEN_FG')
+DRY_RUN = os.getenv('DRY_RUN') == '1'
+OUTLINE_FILE = Path(os.getenv('OUTLINE_FILE', 'outline.md'))
+
+if not TOKEN:
+    sys.stderr.write('ERROR: Missing GITHUB_TOKEN / GITHUB_TOKEN_FG\n')
+    sys.exit(1)
+
+GQL_ENDPOINT = 'https://api.github.com/graphql'
+HEADERS = {"Authorization": f"bearer {TOKEN}",
+           "Accept": "application/vnd.github+json"}
+# Shared keep-alive session: one TLS handshake for every page of the run.
+# Only read-only GraphQL queries are sent, so POST is safe to retry.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(
+    total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])))
+
+
+def gql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    resp = SESSION.post(GQL_ENDPOINT, json={
+                        'query': query, 'variables': variables}, timeout=60)
+    try:
+        data = resp.json()
+    except ValueError:
+        raise RuntimeError(
+            f'Non-JSON response: {resp.status_code} {resp.text[:200]}')
+    if 'errors' in data:
+        raise RuntimeError(f'GraphQL errors: {data["errors"]}')
+    return data
+
+
+def fetch_project_issues() -> List[Dict[str, Any]]:
+    q = """
+    query($login:String!, $num:Int!, $cursor:String){
+      user(login:$login){
+        projectV2(number:$num){
+          # 100 is the connection cap; body rides along at no extra query cost
+          items(first:100, after:$cursor){
+            pageInfo{hasNextPage endCursor}
+            nodes{ content{ __typename ... on Issue { id number title url state body updatedAt } } }
+          }
+        }
+      }
+    }
+    """
+    cursor = None
+    issues: List[Dict[str, Any]] = []
+    while True:
+        data = gql(
+            q, {'login': USERNAME, 'num': PROJECT_NUMBER, 'cursor': cursor})
+        proj = data['data']['user'].get('projectV2')
+        if not proj:
+            raise RuntimeError(
+                f'Project {PROJECT_NUMBER} not found for user {USERNAME}')
+        items = proj['items']
+        for node in items['nodes']:
+            c = node.get('content')
+            if c and c.get('__typename') == 'Issue':
+                issues.append({
+                    'number': c['number'],
+                    'title': c['title'],
+                    'url': c['url'],
+                    'state': c.get('state'),
+                    'body': c.get('body'),
+                    'updatedAt': c.get('updatedAt')
+                })
+        if not items['pageInfo']['hasNextPage']:
+            break
+        cursor = items['pageInfo']['endCursor']
+    return issues
+
+
+# First line of a two-line task node label, capturing checkbox mark (space or x), matched
+# over the whole outline text: the lookahead requires the notebook link on the next line.
+# rest is greedy up to its last non-blank character, so the engine backtracks once to hand
+# the trailing blanks to trail instead of retrying \s{2}$ after every character.
+NODE_PAIR_RE = re.compile(
+    r'^(?P<prefix>[ \t]*P\w+\["- \[)(?P<mark> |x)(?P<post>\] )(?!\[)(?P<rest>[^\n]*\S)(?P<trail>[ \t]{2,})$'
+    r'(?=\n[^\n]*\[\[notebooks/)', re.MULTILINE)
+# Node id, title, url of a linked node label (after linking), for click directives
+NODE_EXTRACT_RE = re.compile(
+    r'^(?P<indent>[ \t]*)(?P<node>P\w+)\["- \[[ x]\] \[(?P<title>[^\]]+)\]\((?P<url>https://github.com/[^\)]+/issues/(?P<num>\d+))\)',
+    re.MULTILINE)
+
+
+def load_outline() -> str:
+    if not OUTLINE_FILE.exists():
+        raise FileNotFoundError(f'Missing outline file: {OUTLINE_FILE}')
+    return OUTLINE_FILE.read_text(encoding='utf-8')
+
+
+def link_text(text: str, issues_by_title: Dict[str, Dict[str, Any]],
+              node_click_map: Dict[str, Dict[str, str]]) -> str:
+    """Return the outline text with task titles linked; fills node_click_map.
+
+    One multiline sub() over the whole buffer replaces the per-line Python loop.
+    """
+    changed = 0
+
+    def link_node(m: re.Match) -> str:
+        nonlocal changed
+        # one group() call for every piece of the label; mark is ' ' or 'x', rest may already be a link
+        prefix, mark, post, rest, trail = m.group('prefix', 'mark', 'post', 'rest', 'trail')
+        raw_title = rest.strip()
+        # If already link, extract title inside first []
+        if raw_title.startswith('[') and '](' in raw_title:
+            # title is between first '[' and first ']'
+            plain_title = raw_title[1:raw_title.find('](')]
+        else:
+            plain_title = raw_title
+        issue = issues_by_title.get(plain_title)
+        if not issue:
+            return m.group()
+        issue_url = issue['url']
+        desired_mark = 'x' if (issue.get('state') == 'CLOSED') else mark
+        # Build linked title if not already linked
+        if not (raw_title.startswith('[') and '](' in raw_title):
+            linked_title = f'[{plain_title}]({issue_url})'
+        else:
+            linked_title = raw_title  # keep existing link
+        new_line = ''.join((prefix, desired_mark, post, linked_title, trail))
+        if new_line != m.group():
+            changed += 1
+        return new_line
+
+    text = NODE_PAIR_RE.sub(link_node, text)
+    # Collect node info for click directives (after potential modification)
+    for mex in NODE_EXTRACT_RE.finditer(text):
+        node_click_map[mex.group('node')] = {
+            'title': mex.group('title'),
+            'url': mex.group('url')
+        }
+    sys.stderr.write(f'Lines changed: {changed}\n')
+    return text
+
+
+def update_lines(lines: Iterable[str], issues_by_title: Dict[str, Dict[str, Any]]) -> List[str]:
+    node_click_map: Dict[str, Dict[str, str]] = {}
+    updated = link_text('\n'.join(lines), issues_by_title, node_click_map).splitlines()
+    # Inject / refresh mermaid click directives inside the mermaid block
+    try:
+        updated = inject_click_directives(updated, node_click_map)
+    except Exception as e:
+        sys.stderr.write(f'WARNING: failed to inject click directives: {e}\n')
+    return updated
+
+
+def inject_click_directives(lines: List[str], node_click_map: Dict[str, Dict[str, str]]) -> List[str]:
+    if not node_click_map:
+        return lines
+    # Find mermaid code fence boundaries
+    start_idx = None
+    end_idx = None
+    for idx, ln in enumerate(lines):
+        if start_idx is None and ln.strip().startswith('```mermaid'):
+            start_idx = idx
+            continue
+        if start_idx is not None and ln.strip() == '```':
+            end_idx = idx
+            break
+    if start_idx is None or end_idx is None:
+        return lines  # no mermaid block
+    # Remove existing click lines in block
+    block = lines[start_idx+1:end_idx]
+    filtered_block = [b for b in block if not b.strip().startswith('click ')]
+    # Append new click directives just before the closing fence (after existing content)
+    click_lines = []
+    for node_id in sorted(node_click_map.keys()):
+        info = node_click_map[node_id]
+        title = info['title'].replace('"', "'")
+        url = info['url']
+        click_lines.append(f'    click {node_id} "{url}" "{title}"')
+    # Ensure a blank line before directives for readability
+    if filtered_block and filtered_block[-1].strip() != '':
+        filtered_block.append('')
+    filtered_block.extend(click_lines)
+    new_lines = lines[:start_idx+1] + filtered_block + lines[end_idx:]
+    return new_lines
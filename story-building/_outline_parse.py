@@ -0,0 +1,53 @@
+"""Outline (Mermaid) node pattern shared by the notebook scripts; compiled once per process.
+
+A parent node spans two lines of outline.md:
+  P1A["- [ ] [Ontology Loading & Inspection](https://github.com/<owner>/<repo>/issues/1) (0/6 • 0%)  \\
+        [[notebooks/ontology_load_and_query.ipynb]]"]
+"""
+
+import os
+import re
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# issue line + notebook line captured in one MULTILINE sweep (no line list, no lookahead index)
+OUTLINE_NODE_RE = re.compile(
+    r'^(?P<indent>[ \t]*)(?P<node>P\w+)\["- \[[ x]\] \[[^\]\n]+\]'
+    r'\((?P<url>https://github\.com/[^/]+/[^/]+/issues/(?P<num>\d+))\)[^\n]*\n'
+    r'[ \t]*\[\[(?P<path>[^\]\n]+\.ipynb)\]\]"?\]', re.MULTILINE)
+
+OUTLINE_CACHE_FILE = Path.home() / '.cache' / 'owl-client-relationship' / 'outline_parse.json'
+OUTLINE_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds; stale entries are dropped on the next save
+
+
+def parse_outline_nodes(outline_text: str) -> List[Dict[str, str]]:
+    return [{k: m[k] for k in ('node', 'num', 'url', 'path')}
+            for m in OUTLINE_NODE_RE.finditer(outline_text)]
+
+
+def outline_nodes(path: Path) -> List[Dict[str, str]]:
+    """Node records of an outline file, reparsed only when its mtime or size changes."""
+    st = path.stat()
+    key = f'{path.resolve()}:{st.st_mtime_ns}:{st.st_size}'
+    try:
+        cache = json.loads(OUTLINE_CACHE_FILE.read_text(encoding='utf-8'))
+    except Exception:
+        cache = {}
+    entry = cache.get(key)
+    if entry:
+        return entry['nodes']  # hit: the outline is not even read
+    nodes = parse_outline_nodes(path.read_text(encoding='utf-8'))
+    now = time.time()
+    cache = {k: v for k, v in cache.items()
+             if now - v.get('saved_at', 0) < OUTLINE_CACHE_MAX_AGE and not k.startswith(f'{path.resolve()}:')}
+    cache[key] = {'saved_at': now, 'nodes': nodes}
+    try:
+        OUTLINE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = OUTLINE_CACHE_FILE.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(cache), encoding='utf-8')
+        os.replace(tmp, OUTLINE_CACHE_FILE)
+    except Exception:
+        pass  # cache is best-effort
+    return nodes
@@ -0,0 +1,315 @@
+"""Annotate outline.md tasks with sub-issue completion progress.
+
+For each top-level story task line inside the mermaid block (two-line node label):
+  P1A["- [ ] [Title](.../issues/<n>)  
+      [[notebooks/....]]"]
+
+We identify the parent issue number (<n>), fetch only the referenced parents and then their
+children (two aliased GraphQL passes, independent of repo size), gather sub-issues from the parent issue body
+markdown checklist lines (pattern: '- [ ] #<child>' or '- [x] #<child>'), count closed vs total,
+and append a progress annotation: (closed/total • P%). E.g.:
+
+  P1A["- [ ] [Title](.../issues/1) (3/7 • 43%)  
+
+Idempotent: existing progress annotations '(d+/d+ • d+%)' are replaced.
+
+Environment variables:
+  GITHUB_TOKEN / GITHUB_TOKEN_FG  required
+  USERNAME                        default alexanderwiebe
+  PROJECT_NUMBER                  currently unused (outline-referenced issues are fetched via GraphQL)
+  OUTLINE_FILE                    default outline.md
+  DRY_RUN=1                       preview only
+  INCLUDE_ZERO=1                  include (0/0 • 0%) when no sub-issues found
+
+Notes:
+  - This module holds the progress pass; update_outline.py runs it together with the link
+    pass in one read/write of the outline (alone with --progress-only, or the
+    update_outline_progress.py wrapper).
+  - Exact issue link extraction expects '/issues/<number>' in the link.
+  - Sub-issue detection relies on parent body checklists created earlier by automation.
+"""
+
+from __future__ import annotations
+import functools
+import os
+import re
+import sys
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+load_dotenv(ROOT / '.env')
+
+USERNAME = os.getenv('USERNAME', 'alexanderwiebe')
+TOKEN = os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_TOKEN_FG')
+OUTLINE_FILE = Path(os.getenv('OUTLINE_FILE', 'outline.md'))
+DRY_RUN = os.getenv('DRY_RUN') == '1'
+INCLUDE_ZERO = os.getenv('INCLUDE_ZERO') == '1'
+REPO_NAME = f"{USERNAME}/owl-client-relationship"
+
+if not TOKEN:
+    sys.stderr.write('ERROR: Missing GITHUB_TOKEN / GITHUB_TOKEN_FG\n')
+    sys.exit(1)
+
+GQL_ENDPOINT = 'https://api.github.com/graphql'
+HEADERS = {"Authorization": f"bearer {TOKEN}",
+           "Accept": "application/vnd.github+json"}
+# Shared keep-alive session: one TLS handshake for every page of the run.
+# Only read-only GraphQL queries are sent, so POST is safe to retry.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(
+    total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])))
+OWNER, NAME = REPO_NAME.split('/')
+GQL_BATCH = 50  # aliased issue(number:) lookups per GraphQL request
+# GraphQL has no ETags: keep a snapshot and only fetch issues updated since the last run
+ISSUE_SNAPSHOT_FILE = Path.home() / '.cache' / 'owl-client-relationship' / 'outline_progress_issues.json'
+# parsed checklist children per issue, reused while the issue's updatedAt is unchanged
+CHECKLIST_CACHE_FILE = Path.home() / '.cache' / 'owl-client-relationship' / 'outline_progress_checklists.json'
+
+
+def gql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    resp = SESSION.post(GQL_ENDPOINT, json={
+                        'query': query, 'variables': variables}, timeout=60)
+    try:
+        data = resp.json()
+    except ValueError:
+        raise RuntimeError(
+            f'Non-JSON response: {resp.status_code} {resp.text[:200]}')
+    if 'errors' in data:
+        raise RuntimeError(f'GraphQL errors: {data["errors"]}')
+    return data
+
+
+def _query_issue_batch(numbers: List[int]) -> Dict:
+    fields = ' '.join(f'i{n}: issue(number:{n}){{ number state body updatedAt }}' for n in numbers)
+    q = f'query($o:String!,$n:String!){{ repository(owner:$o,name:$n){{ {fields} }} }}'
+    r = SESSION.post(GQL_ENDPOINT, json={'query': q, 'variables': {'o': OWNER, 'n': NAME}}, timeout=60)
+    data = r.json()
+    repo = (data.get('data') or {}).get('repository')
+    if repo is None:
+        raise RuntimeError(data.get('errors') or f'status {r.status_code}')
+    return repo
+
+
+def _fetch_issues(numbers: Iterable[int], issues: Dict[int, dict]):
+    """Add the given numbers to `issues`, one aliased GraphQL query per GQL_BATCH numbers."""
+    missing = sorted(set(numbers) - issues.keys())
+    for start in range(0, len(missing), GQL_BATCH):
+        chunk = missing[start:start + GQL_BATCH]
+        repo = _query_issue_batch(chunk)
+        for n in chunk:
+            issue = repo.get(f'i{n}')
+            if not issue:
+                sys.stderr.write(f'WARN: fetch issue #{n} failed: not found\n')
+                continue
+            issue['state'] = issue['state'].lower()  # REST spelling, as compute_progress expects
+            issues[n] = issue
+
+
+def fetch_outline_issues(text: str, known: Dict[int, dict] | None = None) -> Dict[int, dict]:
+    """Issues the outline needs: every '/issues/<n>' parent, then their checklist children.
+
+    `known` seeds the map (e.g. the link pass's project issues, which carry state and body);
+    their numbers count as parents since the link pass may have just linked them.
+    """
+    issues: Dict[int, dict] = dict(known or {})
+    parents = set(map(int, ISSUE_REF_RE.findall(text))) | issues.keys()
+    try:
+        _fetch_issues(parents, issues)
+        _fetch_issues((c for n in parents if n in issues
+                       for c in child_numbers_for(issues[n])), issues)
+    except Exception as e:
+        sys.stderr.write(f'WARN: GraphQL issue batch failed ({e}); listing all repo issues\n')
+        return list_repo_issues(parents)
+    sys.stderr.write(f'Issues loaded: {len(issues)} ({len(parents)} outline parents)\n')
+    return issues
+
+
+def list_repo_issues(parents: Set[int] | None = None) -> Dict[int, dict]:
+    """number -> {number, state, body}; refreshed incrementally from a snapshot via since.
+
+    Without a snapshot, paging stops once `parents` and their checklist children are all in
+    hand; that partial listing is not saved as a snapshot.
+    """
+    started = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    try:
+        snapshot = json.loads(ISSUE_SNAPSHOT_FILE.read_text())
+        if snapshot.get('repo') != REPO_NAME:
+            snapshot = None
+    except Exception:
+        snapshot = None
+    issues = {int(k): v for k, v in snapshot['issues'].items()} if snapshot else {}
+    page, complete = _page_issues(snapshot['since'] if snapshot else None,
+                                  None if snapshot else parents)
+    issues.update(page)
+    if not complete:
+        return issues
+    try:
+        ISSUE_SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ISSUE_SNAPSHOT_FILE.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(
+            {'repo': REPO_NAME, 'since': started, 'issues': issues}), encoding='utf-8')
+        os.replace(tmp, ISSUE_SNAPSHOT_FILE)
+    except Exception:
+        pass  # snapshot is best-effort
+    return issues
+
+
+def _page_issues(since: str | None, needed: Set[int] | None = None) -> Tuple[Dict[int, dict], bool]:
+    """Issues updated since `since` (all when None); the issues connection already excludes PRs.
+
+    Open and closed issues are paged as two aliased connections advancing side by side in
+    each request, so the round-trips follow the larger of the two sets, not their sum.
+    Both are ordered oldest first; with `needed`, paging ends early once those numbers and
+    their children are collected. Returns (issues, whether every page was read).
+    """
+    q = """
+    query($owner:String!, $name:String!, $open:String, $closed:String, $since:DateTime,
+          $skipOpen:Boolean!, $skipClosed:Boolean!){
+      repository(owner:$owner, name:$name){
+        open: issues(first:100, after:$open, states:[OPEN], filterBy:{since:$since},
+                     orderBy:{field:CREATED_AT, direction:ASC}) @skip(if:$skipOpen){
+          pageInfo{hasNextPage endCursor}
+          nodes{ number state body updatedAt }
+        }
+        closed: issues(first:100, after:$closed, states:[CLOSED], filterBy:{since:$since},
+                       orderBy:{field:CREATED_AT, direction:ASC}) @skip(if:$skipClosed){
+          pageInfo{hasNextPage endCursor}
+          nodes{ number state body updatedAt }
+        }
+      }
+    }
+    """
+    issues: Dict[int, dict] = {}
+    cursors: Dict[str, Any] = {'open': None, 'closed': None}
+    pending = {'open', 'closed'}
+    parents = set(needed or ())
+    needed = set(needed) if needed is not None else None
+    while pending:
+        data = gql(q, {'owner': OWNER, 'name': NAME, 'since': since, **cursors,
+                       'skipOpen': 'open' not in pending, 'skipClosed': 'closed' not in pending})
+        repo = data['data']['repository']
+        for key in list(pending):
+            conn = repo[key]
+            for it in conn['nodes']:
+                it['state'] = it['state'].lower()  # REST spelling, as compute_progress expects
+                issues[it['number']] = it
+                if needed is not None:
+                    if it['number'] in parents:
+                        needed.update(n for n in child_numbers_for(it) if n not in issues)
+                    needed.discard(it['number'])
+            if conn['pageInfo']['hasNextPage']:
+                cursors[key] = conn['pageInfo']['endCursor']
+            else:
+                pending.discard(key)
+        if needed is not None and not needed:
+            return issues, not pending
+    return issues, True
+
+
+ISSUE_REF_RE = re.compile(r'/issues/(\d+)')
+PARENT_LINK_LINE = re.compile(
+    r'^(?P<indent>\s*P\w+\["- \[)(?P<mark> |x)(?P<mid>\] )(?P<link>\[[^\]]+\]\(https://github.com/[^\)]+/issues/(?P<num>\d+)\))(?P<rest>.*)$')
+PROGRESS_ANNOTATION = re.compile(r'\s*\(\d+/\d+\s+•\s+\d+%\)')
+CHECKLIST_CHILD = re.compile(r'^- \[(?: |x|X)\] #(\d+)', re.MULTILINE)
+
+
+def extract_child_numbers(parent_body: str) -> List[int]:
+    # one capture group of \d+: findall hands back digit strings, int() cannot fail
+    return list(map(int, CHECKLIST_CHILD.findall(parent_body or '')))
+
+
+_checklists: Dict[str, dict] | None = None  # loaded from CHECKLIST_CACHE_FILE on first use
+_checklists_dirty = False
+
+
+def child_numbers_for(issue: dict) -> List[int]:
+    """Checklist children of an issue, reparsed only when its updatedAt changes."""
+    global _checklists, _checklists_dirty
+    updated_at = issue.get('updatedAt')
+    if not updated_at:
+        return extract_child_numbers(issue.get('body') or '')
+    if _checklists is None:
+        try:
+            _checklists = json.loads(CHECKLIST_CACHE_FILE.read_text(encoding='utf-8'))
+        except Exception:
+            _checklists = {}
+    key = f"{REPO_NAME}#{issue['number']}"
+    entry = _checklists.get(key)
+    if entry and entry['updated_at'] == updated_at:
+        return entry['children']
+    children = extract_child_numbers(issue.get('body') or '')
+    _checklists[key] = {'updated_at': updated_at, 'children': children}
+    _checklists_dirty = True
+    return children
+
+
+def save_checklist_cache():
+    if not _checklists_dirty:
+        return
+    try:
+        CHECKLIST_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CHECKLIST_CACHE_FILE.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(_checklists), encoding='utf-8')
+        os.replace(tmp, CHECKLIST_CACHE_FILE)
+    except Exception:
+        pass  # cache is best-effort
+
+
+def compute_progress(parent_issue: dict, issue_map: Dict[int, dict]) -> Tuple[int, int, int]:
+    child_nums = child_numbers_for(parent_issue)
+    total = len(child_nums)
+    closed = 0
+    for n in child_nums:
+        child = issue_map.get(n)
+        if child and child.get('state') == 'closed':
+            closed += 1
+    percent = int(round((closed / total) * 100)) if total else 0
+    return closed, total, percent
+
+
+_issue_map: Dict[int, dict] = {}  # the map annotate_lines is running against
+
+
+@functools.lru_cache(maxsize=None)
+def _progress_for_number(num: int) -> Tuple[int, int, int]:
+    # several outline nodes may reference one parent: its checklist is parsed once per run
+    return compute_progress(_issue_map[num], _issue_map)
+
+
+def annotate_lines(lines: Iterable[str], issue_map: Dict[int, dict]) -> Iterator[str]:
+    """Yield lines with progress annotations refreshed (streamed; no second list is built)."""
+    global _issue_map
+    _issue_map = issue_map
+    _progress_for_number.cache_clear()  # results from an earlier map are stale
+    changes = 0
+    for line in lines:
+        if '/issues/' not in line or '["- [' not in line:  # substring checks before the regex
+            yield line
+            continue
+        m = PARENT_LINK_LINE.match(line)
+        if m:
+            num = int(m.group('num'))
+            if num in issue_map:
+                closed, total, percent = _progress_for_number(num)
+                if total > 0 or INCLUDE_ZERO:
+                    # Remove existing annotation before adding new
+                    rest_clean = PROGRESS_ANNOTATION.sub('', m.group('rest'))
+                    # Preserve two trailing spaces if present (markdown line break inside node label)
+                    trailing_two = '  ' if rest_clean.endswith('  ') else ''
+                    rest_core = rest_clean[:-2] if trailing_two else rest_clean
+                    annotation = f' ({closed}/{total} • {percent}%)'
+                    new_line = f"{m.group('indent')}{m.group('mark')}{m.group('mid')}{m.group('link')}{rest_core}{annotation}{trailing_two}"
+                    if new_line != line:
+                        line = new_line
+                        changes += 1
+        yield line
+    sys.stderr.write(f'Progress annotations updated: {changes}\n')
+    save_checklist_cache()
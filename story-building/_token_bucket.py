@@ -0,0 +1,39 @@
+"""Client-side write pacing shared by the GraphQL scripts (ai-decompose, create-tickets-2)."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Client-side token bucket pacing for GitHub writes.
+
+    Refills `rate` tokens/sec up to `capacity`. Tokens may go negative (debt), in which
+    case `acquire` sleeps until the debt is repaid.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens +
+                          (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, n: int = 1):
+        with self._lock:
+            self._refill()
+            self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+    def penalize(self):
+        """Called after an HTTP 429: push the bucket into debt so later writes back off."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(-1, self.tokens - self.rate)
@@ -15,6 +15,7 @@ Environment:
   GITHUB_TOKEN     (required for GitHub REST & GraphQL)
   STORY_REGEX      (optional override, Python regex applied to title)
   DRY_RUN=1        (preview actions without creating anything)
+  GPT_CONCURRENCY  (optional, max parallel GPT decompositions; default 8)
 
 Configuration constants below can be edited locally.
 """
@@ -23,13 +24,21 @@ from __future__ import annotations
 import os
 import re
 import json
-import time
+import asyncio
+import hashlib
+import io
+from datetime import datetime, timezone
 import requests
-from typing import List, Dict, Any, Iterable, Set
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, AsyncIterator, Iterable, Set, Tuple
 from dotenv import load_dotenv
-from github import Github, Auth
 
-import openai
+from openai import AsyncOpenAI
+from _gpt_models import LEGACY_JSON_MODELS
+from _jsonio import loads
+from _token_bucket import TokenBucket
+from _gql import GATEWAY_ERRORS, ID_CACHE, ID_CACHE_FILE, gql_request, save_id_cache
 
 # ---- CONFIG ----
 # GitHub username owning the user project
@@ -40,7 +49,12 @@ STORY_PREFIX = "Story:"                      # Story title prefix
 MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 MAX_TOKENS = 600
 TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))
-RATE_DELAY = 0.4                             # seconds between GitHub write calls
+JSON_MODE = not MODEL.startswith(LEGACY_JSON_MODELS)
+# max concurrent GPT requests (respect OpenAI tier limits)
+GPT_CONCURRENCY = int(os.getenv("GPT_CONCURRENCY", "8"))
+# GitHub GraphQL budget is 5000/hour: ~1.4 writes/sec sustained
+RATE_PER_SEC = 1.4
+RATE_BURST = 50
 
 # ---- ENV ----
 load_dotenv()
@@ -59,29 +73,46 @@ if not OPENAI_API_KEY:
 if not GITHUB_TOKEN:
     raise SystemExit("GITHUB_TOKEN (or GITHUB_TOKEN_FG) not set")
 
-openai.api_key = OPENAI_API_KEY
+# ---- Compiled patterns ----
+STORY_RE = re.compile(STORY_REGEX) if STORY_REGEX else None
+CHILD_TITLE_RE = re.compile(r"^Story #\d+ – ")
+TASKLIST_RE = re.compile(r"^- \[.\] #(?P<num>\d+)", re.MULTILINE)
+JSON_ARRAY_RE = re.compile(r"(\[.*\])", re.DOTALL)
+SUBISSUES_HEADER_RE = re.compile(r"(?im)^[ \t]*###[ \t]+sub-issues\b")
+
+# single async client: its pooled HTTP connection is reused by every decomposition
+client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 GH_API_GRAPHQL = "https://api.github.com/graphql"
 HEADERS_GQL = {"Authorization": f"bearer {GITHUB_TOKEN}"}
 HEADERS_REST = {"Authorization": f"token {GITHUB_TOKEN}",
                 "Accept": "application/vnd.github+json"}
 
-auth = Auth.Token(GITHUB_TOKEN)
-gh = Github(auth=auth)
-repo = gh.get_repo(REPO_NAME)
+# Shared keep-alive session for GraphQL (one TLS handshake for the whole run).
+# urllib3's default allowed_methods leave POST out: gql() resends read-only documents itself.
+SESSION = requests.Session()
+SESSION.headers.update({**HEADERS_GQL, "Content-Type": "application/json"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=Retry(
+    total=5, backoff_factor=0.5, status_forcelist=list(GATEWAY_ERRORS))))
+
+GQL_BUCKET = TokenBucket(rate=RATE_PER_SEC, capacity=RATE_BURST)
+
 
+def gql(query: str, variables: Dict[str, Any] | None = None,
+        read_only: bool | None = None, partial: bool = False) -> Dict[str, Any]:
+    return gql_request(SESSION, GH_API_GRAPHQL, query, variables, bucket=GQL_BUCKET,
+                       read_only=read_only, partial=partial)
 
-# ---- GraphQL helpers (reuse style from create-tickets-2) ----
-def gql(query: str, variables: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    r = requests.post(GH_API_GRAPHQL, json={
-                      "query": query, "variables": variables or {}}, headers=HEADERS_GQL)
-    data = r.json()
-    if "errors" in data:
-        raise RuntimeError(f"GraphQL errors: {data['errors']}")
-    return data
+
+def alias_errors(data: Dict[str, Any]) -> Dict[str, str]:
+    """alias -> error message, from each error's `path` in a batched response."""
+    return {e["path"][0]: e.get("message", "") for e in data.get("errors") or [] if e.get("path")}
 
 
 def get_project_id(user: str, number: int) -> str:
+    key = f"project:{user}/{number}"
+    if key in ID_CACHE:
+        return ID_CACHE[key]
     q = """
     query($login:String!, $number:Int!) {
       user(login:$login) { projectV2(number:$number) { id } }
@@ -89,9 +120,12 @@ def get_project_id(user: str, number: int) -> str:
     """
     data = gql(q, {"login": user, "number": number})
     try:
-        return data["data"]["user"]["projectV2"]["id"]
+        project_id = data["data"]["user"]["projectV2"]["id"]
     except Exception:
         raise RuntimeError(f"Could not resolve project id: {data}")
+    ID_CACHE[key] = project_id
+    save_id_cache()
+    return project_id
 
 
 def list_project_story_issues(project_id: str) -> List[Dict[str, Any]]:
@@ -118,7 +152,6 @@ def list_project_story_issues(project_id: str) -> List[Dict[str, Any]]:
             }
         }
         """
-    pattern = re.compile(STORY_REGEX) if STORY_REGEX else None
     scanned_titles: List[str] = []
     while True:
         data = gql(q, {"pid": project_id, "cursor": cursor})
@@ -130,8 +163,8 @@ def list_project_story_issues(project_id: str) -> List[Dict[str, Any]]:
             title: str = content["title"]
             scanned_titles.append(title)
             if not ALL_AS_STORIES:
-                if pattern:
-                    if not pattern.search(title):
+                if STORY_RE:
+                    if not STORY_RE.search(title):
                         continue
                 else:
                     if not title.startswith(STORY_PREFIX):
@@ -153,26 +186,76 @@ def list_project_story_issues(project_id: str) -> List[Dict[str, Any]]:
     return issues
 
 
-def list_project_issue_node_ids(project_id: str) -> Set[str]:
-    """Return node_ids of issues already in the project (for quick membership checks)."""
-    existing: Set[str] = set()
-    cursor = None
-    q = """
-    query($pid:ID!, $cursor:String) {
-      node(id:$pid) { ... on ProjectV2 { items(first:100, after:$cursor) { pageInfo { hasNextPage endCursor } nodes { content { __typename ... on Issue { id } } } } } }
-    }
+ISSUE_SNAPSHOT_FILE = ID_CACHE_FILE.parent / "last_run.json"
+
+
+def _load_issue_snapshot() -> Dict[str, Any]:
+    try:
+        data = json.loads(ISSUE_SNAPSHOT_FILE.read_text())
+        return data if isinstance(data, dict) and REPO_NAME == data.get("repo") else {}
+    except Exception:
+        return {}
+
+
+def _save_issue_snapshot(snapshot: Dict[str, Any]):
+    try:
+        ISSUE_SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        ISSUE_SNAPSHOT_FILE.write_text(json.dumps(snapshot))
+    except Exception:
+        pass  # snapshot is best-effort
+
+
+def fetch_repo_issues_incremental() -> List[Dict[str, Any]]:
+    """Return all repo issues (PRs excluded) from a local snapshot refreshed with deltas.
+
+    Only issues updated since the previous run are requested (`since=`). While nothing
+    changes, the stored ETag is replayed via If-None-Match and GitHub answers 304 with no body
+    (304s do not count against the rate limit).
     """
+    snapshot = _load_issue_snapshot()
+    issues: Dict[str, Dict[str, Any]] = snapshot.get("issues", {})
+    since = snapshot.get("since")
+    params: Dict[str, Any] = {"state": "all", "per_page": 100}
+    if since:
+        params["since"] = since
+    headers = dict(HEADERS_REST)
+    if snapshot.get("etag"):
+        headers["If-None-Match"] = snapshot["etag"]
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    r = SESSION.get(f"https://api.github.com/repos/{REPO_NAME}/issues",
+                    params=params, headers=headers, timeout=30)
+    if r.status_code == 304:
+        return list(issues.values())
+    etag = r.headers.get("ETag")
+    changed = 0
     while True:
-        data = gql(q, {"pid": project_id, "cursor": cursor})
-        items = data["data"]["node"]["items"]
-        for node in items["nodes"]:
-            content = node.get("content")
-            if content and content.get("__typename") == "Issue":
-                existing.add(content["id"])
-        if not items["pageInfo"]["hasNextPage"]:
+        if r.status_code != 200:
+            raise RuntimeError(
+                f"Issues fetch failed: {r.status_code} {r.text[:120]}")
+        for it in loads(r.content):
+            if "pull_request" in it:
+                continue
+            issues[str(it["number"])] = {
+                "number": it["number"],
+                "node_id": it["node_id"],
+                "title": it["title"],
+                "body": it.get("body") or "",
+            }
+            changed += 1
+        nxt = r.links.get("next")
+        if not nxt:
             break
-        cursor = items["pageInfo"]["endCursor"]
-    return existing
+        r = SESSION.get(nxt["url"], headers=HEADERS_REST, timeout=30)
+    if changed:
+        # advance the window; the ETag belonged to the old `since` URL
+        snapshot = {"repo": REPO_NAME, "since": started, "etag": None, "issues": issues}
+    else:
+        # keep the same URL so the next run can get a 304 for it
+        snapshot = {"repo": REPO_NAME, "since": since, "etag": etag, "issues": issues}
+    _save_issue_snapshot(snapshot)
+    if DEBUG:
+        print(f"DEBUG: issue snapshot refreshed with {changed} updated issues")
+    return list(issues.values())
 
 
 def list_repo_issues_as_stories() -> List[Dict[str, Any]]:
@@ -181,42 +264,126 @@ def list_repo_issues_as_stories() -> List[Dict[str, Any]]:
     Skip issues that look like generated subtasks (title pattern 'Story #N – ...' or body containing 'PARENT-STORY:').
     """
     stories: List[Dict[str, Any]] = []
-    child_title_re = re.compile(r"^Story #\d+ – ")
-    for issue in repo.get_issues(state="all"):
-        if issue.pull_request is not None:
-            continue
-        title = issue.title
-        body = issue.body or ""
-        if child_title_re.match(title) or "PARENT-STORY:" in body:
+    for issue in fetch_repo_issues_incremental():
+        title = issue["title"]
+        body = issue["body"]
+        if CHILD_TITLE_RE.match(title) or "PARENT-STORY:" in body:
             continue  # skip already generated child tasks
-        stories.append({
-            "number": issue.number,
-            "node_id": issue.raw_data["node_id"],
-            "title": title,
-            "body": body,
-        })
+        stories.append(issue)
     if DEBUG:
         print(f"DEBUG: repo issues considered stories: {len(stories)}")
     return stories
 
 
-def existing_issue_titles() -> Set[str]:
-    titles = set()
-    for issue in repo.get_issues(state="all"):
-        if issue.pull_request is None:
-            titles.add(issue.title)
-    return titles
+def title_key(title: str) -> int:
+    """64-bit digest of a title; sets of these are far smaller than sets of the strings."""
+    return int.from_bytes(hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def find_existing_titles(titles: List[str]) -> Set[str]:
+    """Return the subset of `titles` that already exist as repo issues.
+
+    One GraphQL document per call, with an aliased title `search` per candidate, so the
+    lookup happens server-side instead of paginating every issue title in the repo.
+    `in:title` is a word match, so hits are confirmed by exact title comparison.
+    """
+    if not titles:
+        return set()
+    var_decls = []
+    fields = []
+    variables: Dict[str, Any] = {}
+    for i, title in enumerate(titles):
+        phrase = title.replace('"', " ")
+        var_decls.append(f"$q{i}:String!")
+        fields.append(
+            f"s{i}: search(query:$q{i}, type:ISSUE, first:5) {{ nodes {{ ... on Issue {{ title }} }} }}")
+        variables[f"q{i}"] = f'repo:{REPO_NAME} is:issue in:title "{phrase}"'
+    q = f"query({', '.join(var_decls)}) {{\n  " + "\n  ".join(fields) + "\n}"
+    data = gql(q, variables)["data"]
+    found: Set[str] = set()
+    for i, title in enumerate(titles):
+        if any(n.get("title") == title for n in data[f"s{i}"]["nodes"]):
+            found.add(title)
+    return found
+
+
+def get_repository_id() -> str:
+    key = f"repo:{REPO_NAME}"
+    if key in ID_CACHE:
+        return ID_CACHE[key]
+    owner, name = REPO_NAME.split("/")
+    q = """
+    query($owner:String!, $name:String!) { repository(owner:$owner, name:$name) { id } }
+    """
+    data = gql(q, {"owner": owner, "name": name})
+    try:
+        repository_id = data["data"]["repository"]["id"]
+    except Exception:
+        raise RuntimeError(f"Could not resolve repository id: {data}")
+    ID_CACHE[key] = repository_id
+    save_id_cache()
+    return repository_id
+
 
+def create_issues(repository_id: str, items: List[Tuple[str, str]]) -> List[Dict[str, Any] | None]:
+    """Create several issues in one GraphQL request using aliased `createIssue` mutations.
 
-def create_issue(title: str, body: str) -> Dict[str, Any]:
+    `items` is a list of (title, body); results are returned in the same order, None where
+    that alias failed (the others were still created and must be kept).
+    """
+    if not items:
+        return []
+    if DRY_RUN:
+        for title, _ in items:
+            print(f"DRY_RUN create issue: {title}")
+        return [{"number": -1, "node_id": "DRY_RUN"} for _ in items]
+    var_decls = ["$rid:ID!"]
+    fields = []
+    variables: Dict[str, Any] = {"rid": repository_id}
+    for i, (title, body) in enumerate(items):
+        var_decls.append(f"$t{i}:String!, $b{i}:String")
+        fields.append(
+            f"c{i}: createIssue(input:{{repositoryId:$rid, title:$t{i}, body:$b{i}}}) {{ issue {{ id number }} }}")
+        variables[f"t{i}"] = title
+        variables[f"b{i}"] = body
+    mutation = f"mutation({', '.join(var_decls)}) {{\n  " + "\n  ".join(fields) + "\n}"
+    GQL_BUCKET.acquire(len(items))
+    resp = gql(mutation, variables, partial=True)
+    data, errors = resp["data"], alias_errors(resp)
+    created: List[Dict[str, Any] | None] = []
+    for i, (title, _) in enumerate(items):
+        result = data.get(f"c{i}")
+        if not result:
+            print(f"  Warning: failed to create \"{title}\": {errors.get(f'c{i}', 'no result')}")
+            created.append(None)
+            continue
+        issue = result["issue"]
+        created.append({"number": issue["number"], "node_id": issue["id"]})
+    return created
+
+
+def add_many_to_project(project_id: str, node_ids: List[str]):
+    """Add several issues to the project in one GraphQL request (aliased mutations)."""
+    if not node_ids:
+        return
     if DRY_RUN:
-        print(f"DRY_RUN create issue: {title}")
-        return {"number": -1, "node_id": "DRY_RUN"}
-    r = requests.post(f"https://api.github.com/repos/{REPO_NAME}/issues",
-                      headers=HEADERS_REST, json={"title": title, "body": body})
-    r.raise_for_status()
-    data = r.json()
-    return {"number": data["number"], "node_id": data["node_id"]}
+        for node_id in node_ids:
+            print(f"DRY_RUN add to project: {node_id}")
+        return
+    var_decls = ["$pid:ID!"] + [f"$cid{i}:ID!" for i in range(len(node_ids))]
+    fields = [
+        f"a{i}: addProjectV2ItemById(input:{{projectId:$pid, contentId:$cid{i}}}) {{ item {{ id }} }}"
+        for i in range(len(node_ids))
+    ]
+    variables: Dict[str, Any] = {"pid": project_id}
+    variables.update({f"cid{i}": node_id for i, node_id in enumerate(node_ids)})
+    mutation = f"mutation({', '.join(var_decls)}) {{\n  " + "\n  ".join(fields) + "\n}"
+    GQL_BUCKET.acquire(len(node_ids))
+    resp = gql(mutation, variables, partial=True)
+    errors = alias_errors(resp)
+    for i, node_id in enumerate(node_ids):
+        if not resp["data"].get(f"a{i}"):
+            print(f"  Warning: failed to add {node_id} to project: {errors.get(f'a{i}', 'no result')}")
 
 
 def add_to_project(project_id: str, node_id: str):
@@ -226,50 +393,70 @@ def add_to_project(project_id: str, node_id: str):
     mutation = """
     mutation($pid:ID!, $cid:ID!) { addProjectV2ItemById(input:{projectId:$pid, contentId:$cid}) { item { id } } }
     """
-    gql(mutation, {"pid": project_id, "cid": node_id})
-
-
-def decompose_story_with_gpt(story_text: str) -> List[Dict[str, str]]:
-    prompt = (
-        "Break down the following user story into 5-10 concise implementation tasks. "
-        "Each task MUST be a JSON object with keys 'title' and 'description'. "
-        "Return ONLY a JSON array, no prose. Keep titles <= 70 chars.\n\n" + story_text
-    )
-    resp = openai.ChatCompletion.create(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=TEMPERATURE,
-        max_tokens=MAX_TOKENS
-    )
-    content = resp.choices[0].message.content.strip()
-    # Extract first JSON array
-    match = re.search(r"(\[.*\])", content, re.DOTALL)
-    if not match:
-        return []
+    GQL_BUCKET.acquire()
     try:
-        data = json.loads(match.group(1))
-        if isinstance(data, list):
-            # ensure structure
-            cleaned = []
-            for item in data:
-                if not isinstance(item, dict):
-                    continue
-                title = item.get("title") or item.get(
-                    "name") or "Untitled Task"
-                desc = item.get("description") or ""
-                cleaned.append(
-                    {"title": title.strip(), "description": desc.strip()})
-            return cleaned
-    except Exception:
+        gql(mutation, {"pid": project_id, "cid": node_id})
+    except RuntimeError as e:
+        if "already" not in str(e).lower():
+            raise
+
+
+async def decompose_story_with_gpt(story_text: str) -> List[Dict[str, str]]:
+    if JSON_MODE:
+        prompt = (
+            "Break down the following user story into 5-10 concise implementation tasks. "
+            'Respond with a JSON object of the form {"tasks": [{"title": ..., "description": ...}]}. '
+            "Keep titles <= 70 chars.\n\n" + story_text
+        )
+        resp = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            response_format={"type": "json_object"},
+        )
+        try:
+            data = json.loads(resp.choices[0].message.content).get("tasks")
+        except Exception:
+            return []
+    else:  # legacy snapshots without JSON mode: grep the array out of free text
+        prompt = (
+            "Break down the following user story into 5-10 concise implementation tasks. "
+            "Each task MUST be a JSON object with keys 'title' and 'description'. "
+            "Return ONLY a JSON array, no prose. Keep titles <= 70 chars.\n\n" + story_text
+        )
+        resp = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS
+        )
+        content = resp.choices[0].message.content.strip()
+        # Extract first JSON array
+        match = JSON_ARRAY_RE.search(content)
+        if not match:
+            return []
+        try:
+            data = json.loads(match.group(1))
+        except Exception:
+            return []
+    if not isinstance(data, list):
         return []
-    return []
+    # ensure structure
+    cleaned = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        title = item.get("title") or item.get("name") or "Untitled Task"
+        desc = item.get("description") or ""
+        cleaned.append({"title": title.strip(), "description": desc.strip()})
+    return cleaned
 
 
 def extract_existing_child_numbers(parent_body: str) -> Set[int]:
     """Parse existing task list style child issue references (- [ ] #123)."""
     nums: Set[int] = set()
-    pattern = re.compile(r"^- \[.\] #(?P<num>\d+)", re.MULTILINE)
-    for m in pattern.finditer(parent_body or ""):
+    for m in TASKLIST_RE.finditer(parent_body or ""):
         try:
             nums.add(int(m.group("num")))
         except ValueError:
@@ -277,93 +464,196 @@ def extract_existing_child_numbers(parent_body: str) -> Set[int]:
     return nums
 
 
-def append_tasklist_to_parent(parent_issue_number: int, child_numbers: List[int]):
-    if not child_numbers:
+async def decompose_stories(stories: List[Dict[str, Any]]) -> AsyncIterator[Tuple[Dict[str, Any], List[Dict[str, str]]]]:
+    """Decompose all stories concurrently (bounded by GPT_CONCURRENCY).
+
+    Yields (story, tasks) as each decomposition finishes, so GitHub writes for one story can
+    run while the remaining GPT calls are still in flight.
+    """
+    sem = asyncio.Semaphore(GPT_CONCURRENCY)
+
+    async def bounded_decompose(story: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+        async with sem:
+            try:
+                return story, await decompose_story_with_gpt(story["body"] or story["title"])
+            except Exception as e:
+                print(f"  Warning: GPT decomposition failed for #{story['number']}: {e}")
+                return story, []
+
+    for fut in asyncio.as_completed([bounded_decompose(s) for s in stories]):
+        yield await fut
+
+
+def fetch_issue_nodes(numbers: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Fetch id + body for several issues in one GraphQL query (one alias per issue)."""
+    if not numbers:
+        return {}
+    owner, name = REPO_NAME.split("/")
+    aliases = "\n".join(
+        f"p{k}: issue(number:{n}) {{ id body }}" for k, n in enumerate(numbers))
+    q = f"""
+    query($owner:String!, $name:String!) {{
+      repository(owner:$owner, name:$name) {{
+        {aliases}
+      }}
+    }}
+    """
+    data = gql(q, {"owner": owner, "name": name})["data"]["repository"]
+    nodes: Dict[int, Dict[str, Any]] = {}
+    for k, n in enumerate(numbers):
+        node = data.get(f"p{k}")
+        if node:
+            nodes[n] = node
+    return nodes
+
+
+def build_tasklist_body(body: str, entries: List[Tuple[int, str]]) -> str:
+    """Return `body` with `- [ ] #<num> — <title>` entries appended under '### Sub-issues'."""
+    base = body.rstrip()
+    out = io.StringIO()
+    out.write(base)
+    if base:
+        out.write("\n\n")  # blank separator
+    if not SUBISSUES_HEADER_RE.search(base):
+        out.write("### Sub-issues\n")
+    for num, title in entries:
+        out.write(f"- [ ] #{num} — {title}\n")
+    return out.getvalue()
+
+
+def append_tasklists_to_parents(children_by_parent: Dict[int, Dict[int, str]]):
+    """Append new child entries to every parent's task list.
+
+    `children_by_parent` maps parent number -> {child number: child title}. All parent
+    bodies are read in one query and written back in one aliased `updateIssue` mutation.
+    """
+    children_by_parent = {p: c for p, c in children_by_parent.items() if c}
+    if not children_by_parent:
         return
-    issue = repo.get_issue(parent_issue_number)
-    body = issue.body or ""
-    existing_children = extract_existing_child_numbers(body)
-    new_children = [n for n in child_numbers if n not in existing_children]
-    if not new_children:
+    parents = fetch_issue_nodes(list(children_by_parent))
+    updates: List[Tuple[int, str, str, int]] = []  # (parent number, node id, body, entries)
+    for pnum, child_titles in children_by_parent.items():
+        parent = parents.get(pnum)
+        if not parent:
+            print(f"  Warning: parent #{pnum} not found; task list not updated")
+            continue
+        body = parent.get("body") or ""
+        existing_children = extract_existing_child_numbers(body)
+        entries = [(n, t) for n, t in child_titles.items()
+                   if n not in existing_children]
+        if entries:
+            updates.append((pnum, parent["id"], build_tasklist_body(body, entries), len(entries)))
+    if not updates:
         return
-    lines = body.rstrip().splitlines()
-    if lines and lines[-1].strip() != "":
-        lines.append("")  # blank separator
-    lines.append("### Sub-issues") if not any(l.strip().lower().startswith("### sub-issues")
-                                              for l in lines) else None
-    for num in new_children:
-        # Fetch child title for nicer list entry
-        child_issue = repo.get_issue(num)
-        lines.append(f"- [ ] #{num} — {child_issue.title}")
-    new_body = "\n".join(lines).rstrip() + "\n"
     if DRY_RUN:
-        print(
-            f"DRY_RUN update parent #{parent_issue_number} with {len(new_children)} task list entries")
+        for pnum, _, _, count in updates:
+            print(f"DRY_RUN update parent #{pnum} with {count} task list entries")
         return
-    issue.edit(body=new_body)
+    var_decls = []
+    fields = []
+    variables: Dict[str, Any] = {}
+    for i, (_, node_id, body, _) in enumerate(updates):
+        var_decls.append(f"$id{i}:ID!, $b{i}:String")
+        fields.append(
+            f"u{i}: updateIssue(input:{{id:$id{i}, body:$b{i}}}) {{ issue {{ number }} }}")
+        variables[f"id{i}"] = node_id
+        variables[f"b{i}"] = body
+    mutation = f"mutation({', '.join(var_decls)}) {{\n  " + "\n  ".join(fields) + "\n}"
+    GQL_BUCKET.acquire(len(updates))
+    resp = gql(mutation, variables, partial=True)
+    errors = alias_errors(resp)
+    for i, (pnum, _, _, count) in enumerate(updates):
+        if resp["data"].get(f"u{i}"):
+            print(f"Updated parent #{pnum} task list (+{count})")
+        else:
+            print(f"Warning: failed to update parent #{pnum} task list: {errors.get(f'u{i}', 'no result')}")
+
+
+def process_story(project_id: str, repository_id: str, story: Dict[str, Any], tasks: List[Dict[str, str]],
+                  created_titles: Set[int], children_by_parent: Dict[int, Dict[int, str]]):
+    """GitHub side of one story: ensure parent on project, create missing subtasks."""
+    story_num = story["number"]
+    if f"PARENT-STORY: #{story_num}" in story["body"]:
+        # Already processed marker (if user added marker manually to parent skip) – optional
+        pass
+    print(f"→ Processing Story #{story_num}: {story['title']}")
+    # Ensure parent issue is on project if using ALL_REPO_ISSUES mode
+    # (addProjectV2ItemById is idempotent, so no membership pre-check is needed)
+    if ALL_REPO_ISSUES:
+        try:
+            add_to_project(project_id, story["node_id"])
+            print("  Ensured parent is on project")
+        except Exception as e:
+            print(f"  Warning: failed to add parent to project: {e}")
+    if not tasks:
+        print("  (no tasks produced)")
+        return
+    skipped = 0
+    pending: List[Tuple[str, str]] = []
+    candidates = [f"Story #{story_num} – {t['title']}" for t in tasks]
+    try:
+        existing_titles = find_existing_titles(
+            [c for c in candidates if title_key(c) not in created_titles])
+    except Exception as e:
+        print(f"  Warning: title search failed, skipping story: {e}")
+        return
+    for t, sub_title in zip(tasks, candidates):
+        if sub_title in existing_titles or title_key(sub_title) in created_titles:
+            skipped += 1
+            continue
+        body = (
+            f"Derived from Story #{story_num}: {story['title']}\n\n"
+            f"PARENT-STORY: #{story_num}\n\n"
+            f"{t['description']}".strip()
+        )
+        pending.append((sub_title, body))
+        created_titles.add(title_key(sub_title))
+    created = 0
+    if pending:
+        try:
+            results = create_issues(repository_id, pending)
+            for result, (title, _) in zip(results, pending):
+                if result is None:
+                    created_titles.discard(title_key(title))  # not created: eligible again
+            issues = [(i, title) for i, (title, _) in zip(results, pending) if i is not None]
+            created = len(issues)
+            children_by_parent[story_num] = {
+                i["number"]: title for i, title in issues if i["number"] != -1}
+            add_many_to_project(project_id, [i["node_id"] for i, _ in issues])
+        except Exception as e:
+            print(f"  Warning: failed to create subtasks: {e}")
+    print(f"  Tasks created: {created}, skipped(existing): {skipped}")
 
 
-def main():
+async def main():
     print(f"Repo: {REPO_NAME}  Project#: {PROJECT_NUMBER}  DRY_RUN={DRY_RUN}")
     project_id = get_project_id(USERNAME, PROJECT_NUMBER)
+    repository_id = get_repository_id()
     if ALL_REPO_ISSUES:
         stories = list_repo_issues_as_stories()
     else:
         stories = list_project_story_issues(project_id)
     print(f"Found {len(stories)} story issues (mode: {'ALL_REPO_ISSUES' if ALL_REPO_ISSUES else 'PROJECT'}; ALL_AS_STORIES={ALL_AS_STORIES}, STORY_REGEX={'set' if STORY_REGEX else 'unset'})")
 
-    project_issue_nodes = list_project_issue_node_ids(project_id)
+    # title_key digests of titles created during this run (search index may lag behind new issues)
+    created_titles: Set[int] = set()
+    # parent number -> {child number: child title}, written back once at the end
+    children_by_parent: Dict[int, Dict[int, str]] = {}
 
-    existing_titles = existing_issue_titles()
+    async for story, tasks in decompose_stories(stories):
+        # blocking GitHub calls run in a worker thread so in-flight GPT requests keep streaming
+        await asyncio.to_thread(process_story, project_id, repository_id, story, tasks,
+                                created_titles, children_by_parent)
+    await client.close()
 
-    for story in stories:
-        story_num = story["number"]
-        if f"PARENT-STORY: #{story_num}" in story["body"]:
-            # Already processed marker (if user added marker manually to parent skip) – optional
-            pass
-        print(f"→ Processing Story #{story_num}: {story['title']}")
-        # Ensure parent issue is on project if using ALL_REPO_ISSUES mode and absent
-        if ALL_REPO_ISSUES and story["node_id"] not in project_issue_nodes:
-            try:
-                add_to_project(project_id, story["node_id"])
-                project_issue_nodes.add(story["node_id"])
-                print("  Added parent to project")
-            except Exception as e:
-                print(f"  Warning: failed to add parent to project: {e}")
-        tasks = decompose_story_with_gpt(story["body"] or story["title"])
-        if not tasks:
-            print("  (no tasks produced)")
-            continue
-        created = 0
-        skipped = 0
-        created_child_numbers: List[int] = []
-        for t in tasks:
-            sub_title = f"Story #{story_num} – {t['title']}"
-            if sub_title in existing_titles:
-                skipped += 1
-                continue
-            body = (
-                f"Derived from Story #{story_num}: {story['title']}\n\n"
-                f"PARENT-STORY: #{story_num}\n\n"
-                f"{t['description']}".strip()
-            )
-            issue = create_issue(sub_title, body)
-            add_to_project(project_id, issue["node_id"])
-            existing_titles.add(sub_title)
-            created += 1
-            if issue["number"] != -1:
-                created_child_numbers.append(issue["number"])
-            if not DRY_RUN:
-                time.sleep(RATE_DELAY)
-        print(f"  Tasks created: {created}, skipped(existing): {skipped}")
-        # Link back via task list in parent
-        try:
-            append_tasklist_to_parent(story_num, created_child_numbers)
-        except Exception as e:
-            print(f"  Warning: failed to update parent task list: {e}")
+    # Link back via task list in each parent
+    try:
+        append_tasklists_to_parents(children_by_parent)
+    except Exception as e:
+        print(f"Warning: failed to update parent task lists: {e}")
 
     print("Done.")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
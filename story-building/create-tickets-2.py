@@ -17,12 +17,15 @@ Usage:
 
 from __future__ import annotations
 import os
+from pathlib import Path
 from dotenv import load_dotenv  # load .env automatically
 import sys
-import time
 from typing import Iterable, Set, Dict, Any
 import requests
-from github import Github
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from _token_bucket import TokenBucket
+from _gql import GATEWAY_ERRORS, ID_CACHE, gql_request, save_id_cache
 
 USERNAME = "alexanderwiebe"          # GitHub username owning the project
 REPO_NAME = "alexanderwiebe/owl-client-relationship"
@@ -41,25 +44,31 @@ if not TOKEN:
 INCLUDE_CLOSED = os.getenv("INCLUDE_CLOSED") == "1"
 DRY_RUN = os.getenv("DRY_RUN") == "1"
 PAGE_SIZE = 100
+# GitHub GraphQL budget is 5000/hour: ~1.4 writes/sec sustained
+RATE_PER_SEC = 1.4
+RATE_BURST = 50
 
 headers = {"Authorization": f"bearer {TOKEN}"}
-gh = Github(TOKEN)
-repo = gh.get_repo(REPO_NAME)
+# Shared keep-alive session for GraphQL (one TLS handshake for the whole run).
+# urllib3's default allowed_methods leave POST out: gql() resends read-only documents itself.
+SESSION = requests.Session()
+SESSION.headers.update({**headers, "Content-Type": "application/json"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=Retry(
+    total=5, backoff_factor=0.5, status_forcelist=list(GATEWAY_ERRORS))))
 
+GQL_BUCKET = TokenBucket(rate=RATE_PER_SEC, capacity=RATE_BURST)
 
-def gql(query: str, variables: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    payload = {"query": query, "variables": variables or {}}
-    r = requests.post(GH_API, json=payload, headers=headers)
-    try:
-        data = r.json()
-    except Exception:
-        raise RuntimeError(f"Non-JSON response: {r.text}")
-    if "errors" in data:
-        raise RuntimeError(f"GraphQL errors: {data['errors']}")
-    return data
+
+def gql(query: str, variables: Dict[str, Any] | None = None,
+        read_only: bool | None = None, partial: bool = False) -> Dict[str, Any]:
+    return gql_request(SESSION, GH_API, query, variables, bucket=GQL_BUCKET,
+                       read_only=read_only, partial=partial)
 
 
 def get_project_id(user: str, number: int) -> str:
+    key = f"project:{user}/{number}"
+    if key in ID_CACHE:
+        return ID_CACHE[key]
     q = """
   query($login:String!, $number:Int!) {
     user(login:$login) {
@@ -69,9 +78,12 @@ def get_project_id(user: str, number: int) -> str:
   """
     data = gql(q, {"login": user, "number": number})
     try:
-        return data["data"]["user"]["projectV2"]["id"]
+        project_id = data["data"]["user"]["projectV2"]["id"]
     except Exception:
         raise RuntimeError(f"Cannot resolve project id in response: {data}")
+    ID_CACHE[key] = project_id
+    save_id_cache()
+    return project_id
 
 
 def list_project_issue_node_ids(project_id: str) -> Set[str]:
@@ -113,22 +125,39 @@ def add_issue_to_project(project_id: str, issue_node_id: str):
     if DRY_RUN:
         print(f"DRY_RUN: would add issue node {issue_node_id} to project")
         return
+    GQL_BUCKET.acquire()
     gql(mutation, {"pid": project_id, "cid": issue_node_id})
 
 
 def iter_issue_node_ids(include_closed: bool) -> Iterable[Dict[str, Any]]:
-    state = "all" if include_closed else "open"
-    # PyGithub paginates automatically; we still stream through
-    for issue in repo.get_issues(state=state):
-        # skip pull requests (they appear in issues list)
-        if issue.pull_request is not None:
-            continue
-        yield {
-            "number": issue.number,
-            "title": issue.title,
-            "node_id": issue.raw_data["node_id"],
-            "state": issue.state,
-        }
+    # GraphQL `issues` never includes pull requests; stream page by page (PAGE_SIZE per request)
+    owner, name = REPO_NAME.split("/")
+    states = ["OPEN", "CLOSED"] if include_closed else ["OPEN"]
+    q = """
+  query($owner:String!, $name:String!, $states:[IssueState!], $first:Int!, $cursor:String) {
+    repository(owner:$owner, name:$name) {
+    issues(first:$first, after:$cursor, states:$states) {
+      pageInfo { hasNextPage endCursor }
+      nodes { id number title state }
+    }
+    }
+  }
+  """
+    cursor = None
+    while True:
+        data = gql(q, {"owner": owner, "name": name, "states": states,
+                       "first": PAGE_SIZE, "cursor": cursor})
+        issues = data["data"]["repository"]["issues"]
+        for node in issues["nodes"]:
+            yield {
+                "number": node["number"],
+                "title": node["title"],
+                "node_id": node["id"],
+                "state": node["state"].lower(),
+            }
+        if not issues["pageInfo"]["hasNextPage"]:
+            break
+        cursor = issues["pageInfo"]["endCursor"]
 
 
 def main():
@@ -153,9 +182,6 @@ def main():
             add_issue_to_project(project_id, node_id)
             added += 1
             print(f"➕ Added #{info['number']} - {info['title']}")
-            # gentle rate pacing
-            if not DRY_RUN:
-                time.sleep(0.3)
         except Exception as e:
             print(f"✗ Failed adding #{info['number']}: {e}")
     print(f"Done. Added {added}, skipped {skipped} (already present).")
@@ -1,5 +1,9 @@
+import os
 import re
-from github import Github
+import sys
+from pathlib import Path
+import requests
+from dotenv import load_dotenv
 
 load_dotenv()
 
@@ -15,10 +19,33 @@ if not TOKEN:
 # --- CONFIG ---
 REPO_NAME = "alexanderwiebe/owl-client-relationship"
 PROJECT_NUMBER = 1  # the project number inside the repo (check in URL)
+GH_API = "https://api.github.com/graphql"
+ISSUE_BATCH = 20  # aliased createIssue mutations per GraphQL request
 
 # --- CONNECT ---
-g = Github(TOKEN)
-repo = g.get_repo(REPO_NAME)
+headers = {"Authorization": f"bearer {TOKEN}"}
+rest_headers = {"Authorization": f"token {TOKEN}", "Accept": "application/vnd.github+json"}
+OWNER, NAME = REPO_NAME.split("/")
+
+
+def gql(query, variables=None, partial=False):
+    """Return the data of a GraphQL response; with `partial`, (data, errors) even if some
+    aliases failed, so the caller can keep what the others did."""
+    r = requests.post(GH_API, json={"query": query, "variables": variables or {}},
+                      headers=headers, timeout=60)
+    data = r.json()
+    if "errors" in data and not (partial and data.get("data")):
+        raise RuntimeError(f"GraphQL errors: {data['errors']}")
+    if partial:
+        return data["data"], data.get("errors") or []
+    return data["data"]
+
+
+def aliased_mutation(var_types, fields):
+    """Join aliased mutation fields into one GraphQL document."""
+    decls = ", ".join(f"${name}:{t}" for name, t in var_types.items())
+    return f"mutation({decls}) {{\n  " + "\n  ".join(fields) + "\n}"
+
 
 # read outline.md
 with open("outline.md", "r", encoding="utf-8") as f:
@@ -34,21 +61,50 @@ for match in phase_pattern.finditer(content):
     tasks = task_pattern.findall(phase_body)
     phases[phase_name] = [{"title": t[0], "link": t[1]} for t in tasks]
 
-# ensure milestones for each Phase
-milestones = {m.title: m for m in repo.get_milestones(state="all")}
-for phase_name in phases.keys():
-    if phase_name not in milestones:
-        milestones[phase_name] = repo.create_milestone(phase_name)
+# repository id + existing milestones in one query
+repo_data = gql("""
+query($o:String!, $n:String!) {
+  repository(owner:$o, name:$n) {
+    id
+    milestones(first:100, states:[OPEN, CLOSED]) { nodes { id title number } }
+  }
+}
+""", {"o": OWNER, "n": NAME})["repository"]
+repository_id = repo_data["id"]
+milestones = {m["title"]: m["id"] for m in repo_data["milestones"]["nodes"]}
+
+# ensure milestones for each Phase: GraphQL has no createMilestone, so missing ones go
+# through REST, whose response carries the node id createIssue's milestoneId expects
+for phase_name in phases:
+    if phase_name in milestones:
+        continue
+    r = requests.post(f"https://api.github.com/repos/{REPO_NAME}/milestones",
+                      headers=rest_headers, json={"title": phase_name}, timeout=30)
+    if r.status_code != 201:
+        raise RuntimeError(f"Milestone '{phase_name}' creation failed: {r.status_code} {r.text[:200]}")
+    milestones[phase_name] = r.json()["node_id"]
 
-# create issues
+# create issues (aliased mutations, ISSUE_BATCH per request)
 for phase_name, tasks in phases.items():
-    for task in tasks:
-        title = task["title"]
-        link = task["link"]
-        body = f"Notebook: [{link}]({link})\n\nPhase: {phase_name}"
-        issue = repo.create_issue(
-            title=title,
-            body=body,
-            milestone=milestones[phase_name]
-        )
-        print(f"✅ Created issue: {issue.html_url}")
+    for start in range(0, len(tasks), ISSUE_BATCH):
+        chunk = tasks[start:start + ISSUE_BATCH]
+        var_types = {"rid": "ID!", "mid": "ID!"}
+        variables = {"rid": repository_id, "mid": milestones[phase_name]}
+        fields = []
+        for i, task in enumerate(chunk):
+            title = task["title"]
+            link = task["link"]
+            var_types[f"t{i}"] = "String!"
+            var_types[f"b{i}"] = "String"
+            variables[f"t{i}"] = title
+            variables[f"b{i}"] = f"Notebook: [{link}]({link})\n\nPhase: {phase_name}"
+            fields.append(
+                f"c{i}: createIssue(input:{{repositoryId:$rid, title:$t{i}, body:$b{i}, milestoneId:$mid}}) {{ issue {{ number url }} }}")
+        result, errors = gql(aliased_mutation(var_types, fields), variables, partial=True)
+        # report what was created before failing, so a rerun knows which titles exist
+        for i in range(len(chunk)):
+            if result.get(f"c{i}"):
+                print(f"✅ Created issue: {result[f'c{i}']['issue']['url']}")
+        if errors:
+            failed = [chunk[i]["title"] for i in range(len(chunk)) if not result.get(f"c{i}")]
+            raise RuntimeError(f"createIssue failed for {failed}: {errors}")
@@ -4,6 +4,7 @@ import requests
 import json
 from pathlib import Path
 from dotenv import load_dotenv
+from _jsonio import dumps, loads
 
 # Load .env from project root (parent of this script's directory)
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,7 +18,8 @@ if not TOKEN:
 USER = "alexanderwiebe"
 PROJECT_NUMBER = 1
 API = "https://api.github.com/graphql"
-headers = {"Authorization": f"bearer {TOKEN}"}
+headers = {"Authorization": f"bearer {TOKEN}",
+           "Content-Type": "application/json"}
 
 query = """
 query($login:String!, $number:Int!, $after:String){
@@ -76,16 +78,24 @@ query($login:String!, $number:Int!, $after:String){
 }
 """
 
+# Project field value typename -> key holding the value
+FIELD_VALUE_KEYS = {
+    "ProjectV2ItemFieldTextValue": "text",
+    "ProjectV2ItemFieldSingleSelectValue": "name",
+    "ProjectV2ItemFieldIterationValue": "title",
+    "ProjectV2ItemFieldNumberValue": "number",
+}
+
 
 def run(after=None):
     payload = {"query": query,
                "variables": {"login": USER,
                              "number": PROJECT_NUMBER,
                              "after": after}}
-    r = requests.post(API, json=payload, headers=headers)
+    r = requests.post(API, data=dumps(payload), headers=headers)
     raw_text = r.text
     try:
-        data = r.json()
+        data = loads(r.content)
     except ValueError:
         raise RuntimeError(
             f"Non-JSON response (status {r.status_code}):\n{raw_text[:500]}")
@@ -113,31 +123,25 @@ while True:
     except Exception as e:
         sys.stderr.write(f"Fetch failed: {e}\n")
         sys.exit(1)
-        for node in resp["nodes"]:
-            c = node["content"]
-            if not c or c["__typename"] != "Issue":
-                continue
-            # Flatten field values
-            fields = {}
-            for fv in node["fieldValues"]["nodes"]:
-                t = fv["__typename"]
-                if t == "ProjectV2ItemFieldTextValue":
-                    fields[fv["field"]["name"]] = fv["text"]
-                elif t == "ProjectV2ItemFieldSingleSelectValue":
-                    fields[fv["field"]["name"]] = fv["name"]
-                elif t == "ProjectV2ItemFieldIterationValue":
-                    fields[fv["field"]["name"]] = fv["title"]
-                elif t == "ProjectV2ItemFieldNumberValue":
-                    fields[fv["field"]["name"]] = fv["number"]
-            all_issues.append({
-                "number": c["number"],
-                "title": c["title"],
-                "state": c["state"],
-                "url": c["url"],
-                "fields": fields
-            })
-        if not resp["pageInfo"]["hasNextPage"]:
-            break
-        cursor = resp["pageInfo"]["endCursor"]
+    for node in resp["nodes"]:
+        c = node["content"]
+        if not c or c["__typename"] != "Issue":
+            continue
+        # Flatten field values
+        fields = {}
+        for fv in node["fieldValues"]["nodes"]:
+            key = FIELD_VALUE_KEYS.get(fv["__typename"])
+            if key:
+                fields[fv["field"]["name"]] = fv[key]
+        all_issues.append({
+            "number": c["number"],
+            "title": c["title"],
+            "state": c["state"],
+            "url": c["url"],
+            "fields": fields
+        })
+    if not resp["pageInfo"]["hasNextPage"]:
+        break
+    cursor = resp["pageInfo"]["endCursor"]
 
 print(f"Collected {len(all_issues)} issues")
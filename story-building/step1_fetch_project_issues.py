@@ -6,6 +6,7 @@ Usage:
 
 Environment:
   GITHUB_TOKEN or GITHUB_TOKEN_FG  (must have project read access)
+  SLIM=1                           (omit issue bodies; step2 loads the one it needs)
 
 This script ONLY does retrieval (no GPT, no writes) so you can verify data before proceeding.
 """
@@ -14,15 +15,24 @@ from __future__ import annotations
 import os
 import sys
 import json
+import time
+import hashlib
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from _jsonio import write_json_stdout
 
 # ---- CONFIG (adjust if needed) ----
 USERNAME = "alexanderwiebe"      # GitHub user owner of the user project
 PROJECT_NUMBER = 1               # Project number in URL
 PAGE_SIZE = 100
 GRAPHQL_ENDPOINT = "https://api.github.com/graphql"
+SLIM = os.getenv("SLIM") == "1"
+# GraphQL has no ETags: cache identical responses briefly to dedupe back-to-back runs
+HTTP_CACHE_DIR = Path.home() / ".cache" / "owl-client-relationship" / "http"
+GQL_CACHE_TTL = 60  # seconds
 
 # ---- ENV ----
 ROOT = Path(__file__).resolve().parents[1]
@@ -35,6 +45,11 @@ if not TOKEN:
 
 HEADERS = {"Authorization": f"bearer {TOKEN}",
            "Accept": "application/vnd.github+json"}
+# Shared keep-alive session: one TLS handshake for every call in the run
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])))
 
 # ---- GraphQL Query ----
 QUERY = """
@@ -48,7 +63,7 @@ query($login:String!, $number:Int!, $after:String){
         nodes {
           content {
             __typename
-            ... on Issue { id number title state url body closedAt createdAt updatedAt }
+            ... on Issue { id number title state url %s createdAt updatedAt }
             ... on PullRequest { id number title state url }
           }
           fieldValues(first:20){
@@ -65,22 +80,35 @@ query($login:String!, $number:Int!, $after:String){
     }
   }
 }
-"""
+""" % ("" if SLIM else "body")
 
 
-def gql_fetch(after: str | None):
-    resp = requests.post(
-        GRAPHQL_ENDPOINT,
-        json={"query": QUERY, "variables": {"login": USERNAME,
-                                            "number": PROJECT_NUMBER, "after": after}},
-        headers=HEADERS,
-        timeout=30,
-    )
+def gql_post_cached(payload: dict) -> dict:
+    key = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    path = HTTP_CACHE_DIR / f"gql-{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime < GQL_CACHE_TTL:
+            return json.loads(path.read_text())
+    except Exception:
+        pass
+    resp = SESSION.post(GRAPHQL_ENDPOINT, json=payload, timeout=30)
     try:
         data = resp.json()
     except ValueError:
         raise RuntimeError(
             f"Non-JSON response: status {resp.status_code} body={resp.text[:400]}")
+    if "errors" not in data:
+        try:
+            HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data))
+        except Exception:
+            pass  # cache is best-effort
+    return data
+
+
+def gql_fetch(after: str | None):
+    data = gql_post_cached({"query": QUERY, "variables": {"login": USERNAME,
+                                                          "number": PROJECT_NUMBER, "after": after}})
     if "errors" in data:
         raise RuntimeError(json.dumps(data["errors"], indent=2))
     root = data.get("data", {})
@@ -123,16 +151,19 @@ def collect_issues() -> list[dict[str, object]]:
                 continue  # skip PRs or empty
             fields = flatten_field_values(
                 node.get("fieldValues", {}).get("nodes", []))
-            issues.append({
+            issue = {
+                "id": content["id"],
                 "number": content["number"],
                 "title": content["title"],
                 "state": content["state"],
                 "url": content["url"],
-                "body": content.get("body") or "",
                 "fields": fields,
                 "createdAt": content.get("createdAt"),
                 "updatedAt": content.get("updatedAt"),
-            })
+            }
+            if not SLIM:
+                issue["body"] = content.get("body") or ""
+            issues.append(issue)
         if not page_info["hasNextPage"]:
             break
         cursor = page_info["endCursor"]
@@ -150,7 +181,7 @@ def main():
     if os.getenv("PRETTY_JSON") == "1":
         print(json.dumps(issues, indent=2))
     else:
-        print(json.dumps(issues, separators=(",", ":")))
+        write_json_stdout(issues)
     sys.stderr.write(
         f"Fetched {len(issues)} issues from Project #{PROJECT_NUMBER}.\n")
 
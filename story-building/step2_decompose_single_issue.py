@@ -14,6 +14,7 @@ Environment:
   TEMPERATURE (optional, default 0.2)
   MAX_TASKS (optional int cap; default 12)
   PRETTY_JSON=1 (pretty print)
+  GPT_CONCURRENCY (optional, --all mode; default 5)
 
 Usage:
   # automatic fetch (no pipe)
@@ -29,6 +30,9 @@ Usage:
 You can also pass the issue number as the first CLI arg:
   python story-building/step2_decompose_single_issue.py 42
 
+Or decompose every issue concurrently (prints [{"number", "title", "tasks"}, ...]):
+  python story-building/step2_decompose_single_issue.py --all
+
 Output: JSON array such as:
   [ {"title": "Create X", "description": "..."}, ... ]
 
@@ -39,26 +43,43 @@ from __future__ import annotations
 import os
 import sys
 import json
+import asyncio
+import importlib.util
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
 from typing import List, Dict, Any
 from dotenv import load_dotenv
+from _gpt_models import LEGACY_JSON_MODELS
+from _jsonio import loads, write_json_stdout
+try:
+    import ijson  # streams piped step1 output instead of slurping it
+except ImportError:
+    ijson = None
 import openai  # fallback for legacy; primary path uses OpenAI client
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
+    import httpx  # ships with openai>=1
     _USE_NEW_CLIENT = True
 except ImportError:  # very old openai package
-    OpenAI = None
+    OpenAI = AsyncOpenAI = None
     _USE_NEW_CLIENT = False
+HTTP2 = importlib.util.find_spec('h2') is not None  # httpx needs h2 for HTTP/2
 
 # ---------------- Config -----------------
 USERNAME = "alexanderwiebe"   # user project owner
 PROJECT_NUMBER = 1             # project number
+REPO_NAME = f"{USERNAME}/owl-client-relationship"
 GRAPHQL_ENDPOINT = "https://api.github.com/graphql"
 DEFAULT_MODEL = os.getenv("MODEL", "gpt-3.5-turbo")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.2"))
 MAX_TASKS = int(os.getenv("MAX_TASKS", "12"))
+GPT_CONCURRENCY = int(os.getenv("GPT_CONCURRENCY", "5"))
+JSON_MODE = not DEFAULT_MODEL.startswith(LEGACY_JSON_MODELS)
+MAX_TOKENS = min(700, 60 * MAX_TASKS)
+JSON_ARRAY_RE = re.compile(r"(\[.*\])", re.DOTALL)  # legacy free-text replies
 
 # --------------- Env / Tokens ------------
 ROOT = Path(__file__).resolve().parents[1]
@@ -72,12 +93,20 @@ if not OPENAI_KEY:
     sys.stderr.write("ERROR: Missing OPENAI_API_KEY\n")
     sys.exit(1)
 if _USE_NEW_CLIENT and OpenAI is not None:
-    client = OpenAI(api_key=OPENAI_KEY)
+    # pooled keep-alive (HTTP/2 when h2 is installed) connection to api.openai.com
+    OPENAI_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    client = OpenAI(api_key=OPENAI_KEY, http_client=httpx.Client(
+        http2=HTTP2, limits=OPENAI_LIMITS, timeout=60.0))
 else:
     openai.api_key = OPENAI_KEY
 
 HEADERS = {"Authorization": f"bearer {TOKEN}",
            "Accept": "application/vnd.github+json"}
+# Shared keep-alive session: one TLS handshake for every call in the run
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])))
 
 # --------------- GraphQL Query -----------
 QUERY = """
@@ -87,23 +116,27 @@ query($login:String!, $number:Int!, $after:String){
       id
       items(first:100, after:$after){
         pageInfo { hasNextPage endCursor }
-        nodes { content { __typename ... on Issue { id number title body url state } } }
+        nodes { content { __typename ... on Issue { id number title url state } } }
       }
     }
   }
 }
 """
 
+# Body is only needed for the one issue we decompose
+DETAIL_QUERY = """
+query($id:ID!){ node(id:$id){ ... on Issue { body } } }
+"""
+
 
 def fetch_all_project_issues() -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
     cursor = None
     while True:
-        resp = requests.post(
+        resp = SESSION.post(
             GRAPHQL_ENDPOINT,
             json={"query": QUERY, "variables": {"login": USERNAME,
                                                 "number": PROJECT_NUMBER, "after": cursor}},
-            headers=HEADERS,
             timeout=30,
         )
         try:
@@ -126,9 +159,9 @@ def fetch_all_project_issues() -> List[Dict[str, Any]]:
             if not c or c.get('__typename') != 'Issue':
                 continue
             issues.append({
+                'id': c['id'],
                 'number': c['number'],
                 'title': c['title'],
-                'body': c.get('body') or '',
                 'url': c.get('url'),
                 'state': c.get('state')
             })
@@ -138,6 +171,45 @@ def fetch_all_project_issues() -> List[Dict[str, Any]]:
     return issues
 
 
+def fetch_issue_body(issue_id: str) -> str:
+    resp = SESSION.post(
+        GRAPHQL_ENDPOINT,
+        json={"query": DETAIL_QUERY, "variables": {"id": issue_id}},
+        timeout=30,
+    )
+    try:
+        data = resp.json()
+    except ValueError:
+        raise RuntimeError(
+            f"Non-JSON response: {resp.status_code} {resp.text[:200]}")
+    if 'errors' in data:
+        raise RuntimeError(json.dumps(data['errors'], indent=2))
+    node = data.get('data', {}).get('node') or {}
+    return node.get('body') or ''
+
+
+def fetch_issue_by_number(issue_number: int) -> Dict[str, Any]:
+    """Single REST GET for a known issue, normalized to the listing shape."""
+    r = SESSION.get(
+        f"https://api.github.com/repos/{REPO_NAME}/issues/{issue_number}", timeout=30)
+    if r.status_code == 404:
+        raise SystemExit(f"Issue #{issue_number} not found in repo")
+    if r.status_code != 200:
+        raise RuntimeError(
+            f"Issue fetch failed: {r.status_code} {r.text[:200]}")
+    it = r.json()
+    if 'pull_request' in it:
+        raise SystemExit(f"#{issue_number} is a pull request, not an issue")
+    return {
+        'id': it.get('node_id'),
+        'number': it['number'],
+        'title': it['title'],
+        'body': it.get('body') or '',
+        'url': it.get('html_url'),
+        'state': (it.get('state') or '').upper()
+    }
+
+
 def choose_issue(issues: List[Dict[str, Any]], issue_number: int | None) -> Dict[str, Any]:
     if issue_number is not None:
         for i in issues:
@@ -149,34 +221,38 @@ def choose_issue(issues: List[Dict[str, Any]], issue_number: int | None) -> Dict
     return issues[0]
 
 
-def call_gpt_for_tasks(title: str, body: str) -> List[Dict[str, str]]:
+def build_task_prompt(title: str, body: str) -> str:
     story_text = f"TITLE: {title}\n\nBODY:\n{body}".strip()
-    prompt = (
+    shape = ('Return a JSON object {"tasks": [...]}. ' if JSON_MODE
+             else "Return ONLY a JSON array, no commentary. ")
+    return (
         "You are an assistant splitting a GitHub issue (user story) into actionable development tasks. "
-        "Return ONLY a JSON array, no commentary. Each element MUST have 'title' and 'description'. "
+        + shape + "Each task MUST have 'title' and 'description'. "
         f"Limit to at most {MAX_TASKS} tasks. Titles <= 70 chars. Avoid duplicates.\n\n" + story_text
     )
-    if _USE_NEW_CLIENT and OpenAI is not None:
-        resp = client.chat.completions.create(
-            model=DEFAULT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=TEMPERATURE,
-            max_tokens=700,
-        )
-        content = resp.choices[0].message.content.strip()
-    else:  # legacy path for pinned <1.0 openai lib
-        resp = openai.ChatCompletion.create(
-            model=DEFAULT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=TEMPERATURE,
-            max_tokens=700,
-        )
-        content = resp.choices[0].message.content.strip()
-    match = re.search(r"(\[.*\])", content, re.DOTALL)
-    if not match:
-        return []
+
+
+def completion_kwargs(prompt: str) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "model": DEFAULT_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": TEMPERATURE,
+        "max_tokens": MAX_TOKENS,
+    }
+    if JSON_MODE:  # server-side guarantee of valid JSON
+        kwargs["response_format"] = {"type": "json_object"}
+    return kwargs
+
+
+def parse_tasks(content: str) -> List[Dict[str, str]]:
     try:
-        data = json.loads(match.group(1))
+        if JSON_MODE:
+            data = loads(content).get("tasks")
+        else:
+            match = JSON_ARRAY_RE.search(content)
+            if not match:
+                return []
+            data = loads(match.group(1))
     except Exception:
         return []
     tasks: List[Dict[str, str]] = []
@@ -190,35 +266,102 @@ def call_gpt_for_tasks(title: str, body: str) -> List[Dict[str, str]]:
     return tasks[:MAX_TASKS]
 
 
-def read_issues_from_stdin() -> List[Dict[str, Any]]:
+def call_gpt_for_tasks(title: str, body: str) -> List[Dict[str, str]]:
+    prompt = build_task_prompt(title, body)
+    if _USE_NEW_CLIENT and OpenAI is not None:
+        resp = client.chat.completions.create(**completion_kwargs(prompt))
+        content = resp.choices[0].message.content.strip()
+    else:  # legacy path for pinned <1.0 openai lib
+        resp = openai.ChatCompletion.create(**completion_kwargs(prompt))
+        content = resp.choices[0].message.content.strip()
+    return parse_tasks(content)
+
+
+async def decompose_all(issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Decompose every issue concurrently (bounded by GPT_CONCURRENCY) over one pooled client."""
+    sem = asyncio.Semaphore(GPT_CONCURRENCY)
+
+    async def one(aclient, issue: Dict[str, Any]) -> Dict[str, Any]:
+        async with sem:
+            if issue.get('body') is None:
+                issue['body'] = await asyncio.to_thread(
+                    fetch_issue_body, issue['id']) if issue.get('id') else ''
+            if aclient is None:  # legacy openai: no async client
+                tasks = await asyncio.to_thread(
+                    call_gpt_for_tasks, issue['title'], issue['body'])
+            else:
+                resp = await aclient.chat.completions.create(**completion_kwargs(
+                    build_task_prompt(issue['title'], issue['body'])))
+                tasks = parse_tasks(resp.choices[0].message.content.strip())
+        sys.stderr.write(
+            f"Generated {len(tasks)} tasks for #{issue['number']}: {issue['title']}\n")
+        return {'number': issue['number'], 'title': issue['title'], 'tasks': tasks}
+
+    if not (_USE_NEW_CLIENT and AsyncOpenAI is not None):
+        return list(await asyncio.gather(*(one(None, i) for i in issues)))
+    async with httpx.AsyncClient(http2=HTTP2, limits=OPENAI_LIMITS, timeout=60.0) as http:
+        aclient = AsyncOpenAI(api_key=OPENAI_KEY, http_client=http)
+        return list(await asyncio.gather(*(one(aclient, i) for i in issues)))
+
+
+def _stdin_array_items():
+    stream = sys.stdin.buffer
+    if ijson is not None:
+        return ijson.items(stream, "item")
+    data = loads(stream.read())
+    return data if isinstance(data, list) else []
+
+
+def read_issues_from_stdin(issue_number: int | None = None) -> List[Dict[str, Any]]:
+    """Read piped issues; with a known number, stop at that issue (O(1) memory with ijson)."""
     if sys.stdin.isatty():  # nothing piped
         return []
-    raw = sys.stdin.read().strip()
-    if not raw:
+    if not sys.stdin.buffer.peek(1).strip():
         return []
+    filtered: List[Dict[str, Any]] = []
     try:
-        data = json.loads(raw)
+        for entry in _stdin_array_items():
+            # minimal structure check
+            if not (isinstance(entry, dict) and 'number' in entry and 'title' in entry):
+                continue
+            issue = {
+                'id': entry.get('id'),
+                'number': entry['number'],
+                'title': entry['title'],
+                'body': entry.get('body'),
+                'url': entry.get('url'),
+                'state': entry.get('state', 'UNKNOWN')
+            }
+            if issue_number is None:
+                filtered.append(issue)
+            elif issue['number'] == issue_number:
+                filtered = [issue]
+                break
     except Exception:
         sys.stderr.write(
             "WARNING: stdin provided but not valid JSON; ignoring stdin.\n")
         return []
-    if isinstance(data, list):
-        # minimal structure check
-        filtered = []
-        for entry in data:
-            if isinstance(entry, dict) and 'number' in entry and 'title' in entry:
-                filtered.append({
-                    'number': entry['number'],
-                    'title': entry['title'],
-                    'body': entry.get('body', ''),
-                    'url': entry.get('url'),
-                    'state': entry.get('state', 'UNKNOWN')
-                })
-        return filtered
-    return []
+    # drain the rest so the upstream writer doesn't hit a broken pipe
+    while sys.stdin.buffer.read(65536):
+        pass
+    return filtered
 
 
 def main():
+    if sys.argv[1:2] == ['--all']:
+        issues = read_issues_from_stdin()
+        try:
+            issues = issues or fetch_all_project_issues()
+        except Exception as e:
+            sys.stderr.write(f"ERROR fetching issues: {e}\n")
+            sys.exit(1)
+        results = asyncio.run(decompose_all(issues))
+        if os.getenv('PRETTY_JSON') == '1':
+            print(json.dumps(results, indent=2))
+        else:
+            write_json_stdout(results)
+        return
+
     # Determine issue number from env or arg
     issue_number = None
     if len(sys.argv) > 1:
@@ -235,22 +378,35 @@ def main():
             sys.stderr.write("ISSUE_NUMBER env must be integer\n")
             sys.exit(1)
 
-    issues = read_issues_from_stdin()
-    if not issues:  # fallback to live fetch
+    issues = read_issues_from_stdin(issue_number)
+    if issues:
+        issue = choose_issue(issues, issue_number)
+    else:  # fallback to live fetch
         try:
-            issues = fetch_all_project_issues()
+            if issue_number is not None:  # known number: one call, no project walk
+                issue = fetch_issue_by_number(issue_number)
+            else:
+                issue = choose_issue(fetch_all_project_issues(), None)
         except Exception as e:
             sys.stderr.write(f"ERROR fetching issues: {e}\n")
             sys.exit(1)
 
-    issue = choose_issue(issues, issue_number)
     sys.stderr.write(f"Selected issue #{issue['number']}: {issue['title']}\n")
+    if issue.get('body') is None:  # slim listing: load body for this issue only
+        if issue.get('id'):
+            try:
+                issue['body'] = fetch_issue_body(issue['id'])
+            except Exception as e:
+                sys.stderr.write(f"ERROR fetching issue body: {e}\n")
+                sys.exit(1)
+        else:
+            issue['body'] = ''
 
     tasks = call_gpt_for_tasks(issue['title'], issue['body'])
     if os.getenv('PRETTY_JSON') == '1':
         print(json.dumps(tasks, indent=2))
     else:
-        print(json.dumps(tasks, separators=(',', ':')))
+        write_json_stdout(tasks)
     sys.stderr.write(f"Generated {len(tasks)} tasks.\n")
 
 
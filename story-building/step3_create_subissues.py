@@ -23,7 +23,7 @@ Environment Variables:
   USERNAME                        (override project owner, default config)
   PROJECT_NUMBER                  (override project number, default config)
   DRY_RUN=1                       (print intended actions only)
-  RATE_DELAY=0.3                  (seconds between write calls; default 0.3)
+  RATE_LOW_WATER=50               (start spacing writes below this many remaining calls)
 
 Exit codes:
   0 success, 1 config / input error, 2 runtime API error
@@ -32,13 +32,35 @@ Exit codes:
 from __future__ import annotations
 import os
 import sys
+import logging
+import logging.handlers
 import json
 import time
+import hashlib
+from datetime import datetime, timezone
 import re
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import List, Dict, Any, Set
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Set, Tuple
 from dotenv import load_dotenv
+from _jsonio import loads
+try:
+    import ijson  # streams piped task JSON instead of slurping it
+except ImportError:
+    ijson = None
+
+# Buffered stderr logging: progress lines are written in batches (errors flush at once);
+# logging's atexit shutdown flushes the rest, including on sys.exit
+logger = logging.getLogger("story")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(logging.handlers.MemoryHandler(
+    capacity=200, flushLevel=logging.ERROR, target=_stderr_handler))
 
 # ------------- Config -------------
 DEFAULT_USERNAME = "alexanderwiebe"
@@ -51,7 +73,7 @@ load_dotenv(ROOT / '.env')
 
 TOKEN = os.getenv("GITHUB_TOKEN") or os.getenv("GITHUB_TOKEN_FG")
 if not TOKEN:
-    sys.stderr.write("ERROR: GITHUB_TOKEN / GITHUB_TOKEN_FG not set.\n")
+    logger.error("ERROR: GITHUB_TOKEN / GITHUB_TOKEN_FG not set.")
     sys.exit(1)
 
 USERNAME = os.getenv("USERNAME", DEFAULT_USERNAME)
@@ -59,10 +81,17 @@ try:
     PROJECT_NUMBER = int(
         os.getenv("PROJECT_NUMBER", str(DEFAULT_PROJECT_NUMBER)))
 except ValueError:
-    sys.stderr.write("ERROR: PROJECT_NUMBER must be int.\n")
+    logger.error("ERROR: PROJECT_NUMBER must be int.")
     sys.exit(1)
 
-RATE_DELAY = float(os.getenv("RATE_DELAY", "0.3"))
+RATE_LOW_WATER = int(os.getenv("RATE_LOW_WATER", "50"))
+MAX_RATE_RETRIES = 3
+FETCH_WORKERS = 8  # parallel issue-page GETs (<= session pool_maxsize)
+LAST_PAGE_RE = re.compile(r"[?&]page=(\d+)")
+CHECKLIST_RE = re.compile(r"^- \[.\] #(?P<num>\d+)", re.MULTILINE)
+SEARCH_INDEX_LAG = 300  # seconds; search may miss sub-issues created this recently
+HTTP_CACHE_DIR = Path.home() / ".cache" / "owl-client-relationship" / "http"
+ISSUE_SNAPSHOT_FILE = HTTP_CACHE_DIR.parent / "step3_issues.json"
 DRY_RUN = os.getenv("DRY_RUN") == "1"
 
 # adapt if repo differs from username naming
@@ -72,36 +101,44 @@ REST_HEADERS = {"Authorization": f"token {TOKEN}",
 GQL_ENDPOINT = "https://api.github.com/graphql"
 GQL_HEADERS = {"Authorization": f"bearer {TOKEN}",
                "Accept": "application/vnd.github+json"}
+# Shared keep-alive session: one TLS handshake for every call in the run
+SESSION = requests.Session()
+SESSION.headers.update(REST_HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])))
 
 
 def read_tasks_from_stdin() -> List[Dict[str, str]]:
     if sys.stdin.isatty():
-        sys.stderr.write(
-            "ERROR: No tasks JSON provided on stdin. Pipe from Step 2.\n")
+        logger.error(
+            "ERROR: No tasks JSON provided on stdin. Pipe from Step 2.")
         sys.exit(1)
-    raw = sys.stdin.read().strip()
-    if not raw:
-        sys.stderr.write("ERROR: Empty stdin.\n")
+    stream = sys.stdin.buffer
+    if not stream.peek(1).strip():
+        logger.error("ERROR: Empty stdin.")
         sys.exit(1)
+    tasks: List[Dict[str, str]] = []
     try:
-        data = json.loads(raw)
+        if ijson is not None:
+            items = ijson.items(stream, "item")
+        else:
+            items = loads(stream.read())
+            if not isinstance(items, list):
+                logger.error("ERROR: Expected JSON array for tasks.")
+                sys.exit(1)
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            title = (item.get("title") or "").strip()
+            if not title:
+                continue
+            desc = (item.get("description") or "").strip()
+            tasks.append({"title": title, "description": desc})
     except Exception:
-        sys.stderr.write("ERROR: Stdin not valid JSON array.\n")
-        sys.exit(1)
-    if not isinstance(data, list):
-        sys.stderr.write("ERROR: Expected JSON array for tasks.\n")
+        logger.error("ERROR: Stdin not valid JSON array.")
         sys.exit(1)
-    tasks: List[Dict[str, str]] = []
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-        title = (item.get("title") or "").strip()
-        if not title:
-            continue
-        desc = (item.get("description") or "").strip()
-        tasks.append({"title": title, "description": desc})
     if not tasks:
-        sys.stderr.write("ERROR: No valid tasks with titles found.\n")
+        logger.error("ERROR: No valid tasks with titles found.")
         sys.exit(1)
     return tasks
 
@@ -112,24 +149,24 @@ def resolve_parent_issue_number() -> int:
         try:
             return int(sys.argv[1])
         except ValueError:
-            sys.stderr.write(
-                "ERROR: First argument must be an integer parent issue number.\n")
+            logger.error(
+                "ERROR: First argument must be an integer parent issue number.")
             sys.exit(1)
     issue_env = os.getenv("ISSUE_NUMBER")
     if issue_env:
         try:
             return int(issue_env)
         except ValueError:
-            sys.stderr.write("ERROR: ISSUE_NUMBER env must be integer.\n")
+            logger.error("ERROR: ISSUE_NUMBER env must be integer.")
             sys.exit(1)
-    sys.stderr.write(
-        "ERROR: Provide parent ISSUE_NUMBER (env or first arg).\n")
+    logger.error(
+        "ERROR: Provide parent ISSUE_NUMBER (env or first arg).")
     sys.exit(1)
 
 
 def gql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-    r = requests.post(GQL_ENDPOINT, json={
-                      "query": query, "variables": variables}, headers=GQL_HEADERS)
+    r = SESSION.post(GQL_ENDPOINT, json={
+                     "query": query, "variables": variables}, headers=GQL_HEADERS)
     try:
         data = r.json()
     except ValueError:
@@ -152,125 +189,249 @@ def get_project_id() -> str:
     return proj["id"]
 
 
+def cached_get(url: str, params: Dict[str, Any]) -> tuple[int, Any, Dict[str, Any]]:
+    """GET with an on-disk ETag cache; returns (status, json body, links).
+
+    A 304 (free against the primary rate limit) replays the stored body and links.
+    """
+    key = hashlib.sha1(
+        f"{url}?{json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+    path = HTTP_CACHE_DIR / f"{key}.json"
+    try:
+        entry = json.loads(path.read_text())
+    except Exception:
+        entry = {}
+    headers = {"If-None-Match": entry["etag"]} if entry.get("etag") else {}
+    r = SESSION.get(url, params=params, headers=headers, timeout=30)
+    if r.status_code == 304 and "body" in entry:
+        return 200, entry["body"], entry.get("links", {})
+    if r.status_code != 200:
+        return r.status_code, r.text, {}
+    body = r.json()
+    if r.headers.get("ETag"):
+        try:
+            HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(
+                {"etag": r.headers["ETag"], "body": body, "links": r.links}))
+        except Exception:
+            pass  # cache is best-effort
+    return 200, body, r.links
+
+
+def _fetch_issues_page(page: int) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    status, body, links = cached_get(f"https://api.github.com/repos/{REPO_NAME}/issues", {
+        "state": "all", "per_page": 100, "page": page})
+    if status != 200:
+        raise RuntimeError(
+            f"Issues fetch failed page {page}: {status} {str(body)[:120]}")
+    return body, links
+
+
+def _last_page(links: Dict[str, Any]) -> int | None:
+    last = links.get("last", {}).get("url")
+    if not last:
+        return None
+    m = LAST_PAGE_RE.search(last)
+    return int(m.group(1)) if m else None
+
+
+def _fetch_issues_since(since: str) -> List[Dict[str, Any]]:
+    """Issues updated at/after `since` (typically a handful; walked via Link rel=next)."""
+    changed: List[Dict[str, Any]] = []
+    url = f"https://api.github.com/repos/{REPO_NAME}/issues"
+    params: Dict[str, Any] | None = {"state": "all", "since": since, "per_page": 100}
+    while url:
+        r = SESSION.get(url, params=params, timeout=30)
+        if r.status_code != 200:
+            raise RuntimeError(
+                f"Issues delta fetch failed: {r.status_code} {r.text[:120]}")
+        changed.extend(r.json())
+        url, params = r.links.get("next", {}).get("url"), None  # next URL carries the query
+    return changed
+
+
 def list_repo_issues() -> List[Dict[str, Any]]:
-    # Use REST pagination
-    issues: List[Dict[str, Any]] = []
-    page = 1
+    """Repo issues as {number, title}; refreshed incrementally from a snapshot via since=."""
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        snapshot = json.loads(ISSUE_SNAPSHOT_FILE.read_text())
+        if snapshot.get("repo") != REPO_NAME:
+            snapshot = None
+    except Exception:
+        snapshot = None
+    if snapshot:
+        issues = snapshot["issues"]
+        changed = _fetch_issues_since(snapshot["since"])
+    else:
+        issues = {}
+        changed = _list_all_repo_issues()
+    for it in changed:
+        if "pull_request" in it:  # skip PRs
+            continue
+        issues[str(it["number"])] = {"number": it["number"], "title": it["title"]}
+    try:
+        ISSUE_SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        ISSUE_SNAPSHOT_FILE.write_text(json.dumps(
+            {"repo": REPO_NAME, "since": started, "issues": issues}))
+    except Exception:
+        pass  # snapshot is best-effort
+    return list(issues.values())
+
+
+def _list_all_repo_issues() -> List[Dict[str, Any]]:
+    # REST pages are randomly addressable: learn the page count from page 1's
+    # Link header, then fetch the rest concurrently (results kept in page order)
+    batch, links = _fetch_issues_page(1)
+    batches = [batch]
+    last = _last_page(links)
+    if last is not None:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            batches.extend(b for b, _ in pool.map(
+                _fetch_issues_page, range(2, last + 1)))
+    else:  # no rel=last: single page, or fall back to walking pages serially
+        page = 1
+        while "next" in links and batches[-1]:
+            page += 1
+            batch, links = _fetch_issues_page(page)
+            batches.append(batch)
+    return [it for batch in batches for it in batch]
+
+
+PARENT_AND_CHILDREN_QUERY = """
+query($owner:String!, $repo:String!, $parent:Int!, $q:String!, $after:String){
+  repository(owner:$owner, name:$repo){ issue(number:$parent){ id number title body updatedAt } }
+  search(query:$q, type:ISSUE, first:100, after:$after){
+    pageInfo { hasNextPage endCursor }
+    nodes { ... on Issue { number title } }
+  }
+}
+"""
+
+
+def fetch_parent_and_subissues(parent_number: int) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """One GraphQL round-trip for the parent issue plus its title-matched children."""
+    owner, repo = REPO_NAME.split("/")
+    variables: Dict[str, Any] = {
+        "owner": owner, "repo": repo, "parent": parent_number,
+        "q": f'repo:{REPO_NAME} "Story #{parent_number}" in:title type:issue', "after": None}
+    matches: List[Dict[str, Any]] = []
     while True:
-        r = requests.get(f"https://api.github.com/repos/{REPO_NAME}/issues", params={
-                         "state": "all", "per_page": 100, "page": page}, headers=REST_HEADERS, timeout=30)
-        if r.status_code != 200:
+        d = gql(PARENT_AND_CHILDREN_QUERY, variables)["data"]
+        issue = (d.get("repository") or {}).get("issue")
+        if not issue:
             raise RuntimeError(
-                f"Issues fetch failed page {page}: {r.status_code} {r.text[:120]}")
-        batch = r.json()
-        if not batch:
+                f"Parent issue #{parent_number} not found in repo.")
+        matches.extend(n for n in d["search"]["nodes"] if n)
+        page_info = d["search"]["pageInfo"]
+        if not page_info["hasNextPage"]:
             break
-        for it in batch:
-            if "pull_request" in it:  # skip PRs
-                continue
-            issues.append(it)
-        page += 1
-    return issues
+        variables["after"] = page_info["endCursor"]
+    parent = {"node_id": issue["id"], "number": issue["number"], "title": issue["title"],
+              "body": issue.get("body") or "", "updated_at": issue.get("updatedAt")}
+    # search is tokenized: confirm the exact prefix locally
+    return parent, existing_subissue_titles(parent_number, matches)
 
 
-def get_parent_issue(parent_number: int, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
-    for it in issues:
-        if it["number"] == parent_number:
-            return it
-    raise RuntimeError(f"Parent issue #{parent_number} not found in repo.")
+def recently_updated(issue: Dict[str, Any]) -> bool:
+    ts = issue.get("updated_at")
+    if not ts:
+        return True
+    updated = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return (datetime.now(timezone.utc) - updated).total_seconds() < SEARCH_INDEX_LAG
 
 
 def existing_subissue_titles(parent_number: int, issues: List[Dict[str, Any]]) -> Dict[str, int]:
-    """Map existing subissue title -> issue number (pattern match)."""
-    pattern = re.compile(rf"^Story #{parent_number} – ")
-    mapping: Dict[str, int] = {}
-    for it in issues:
-        title = it.get("title", "")
-        if pattern.match(title):
-            mapping[title] = it["number"]
-    return mapping
+    """Map existing subissue raw task title (prefix stripped) -> issue number."""
+    prefix = ISSUE_TITLE_PREFIX_TEMPLATE.format(parent=parent_number, title="")
+    n = len(prefix)
+    return {t[n:]: it["number"] for it in issues
+            if (t := it.get("title", "")).startswith(prefix)}
+
+
+def throttle(r: requests.Response):
+    """Sleep only when GitHub's rate-limit headers say we are close to the limit."""
+    remaining = r.headers.get("X-RateLimit-Remaining")
+    reset = r.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None or int(remaining) >= RATE_LOW_WATER:
+        return
+    # spread the remaining budget evenly over the reset window
+    window = max(0.0, int(reset) - time.time())
+    time.sleep(window / max(int(remaining), 1))
 
 
 def create_issue(title: str, body: str) -> Dict[str, Any]:
     if DRY_RUN:
         return {"number": -1, "title": title, "body": body}
-    r = requests.post(f"https://api.github.com/repos/{REPO_NAME}/issues",
-                      headers=REST_HEADERS, json={"title": title, "body": body}, timeout=30)
+    for attempt in range(MAX_RATE_RETRIES + 1):
+        r = SESSION.post(f"https://api.github.com/repos/{REPO_NAME}/issues",
+                         json={"title": title, "body": body}, timeout=30)
+        # secondary rate limit: GitHub says exactly how long to back off
+        if r.status_code in (403, 429) and r.headers.get("Retry-After") and attempt < MAX_RATE_RETRIES:
+            time.sleep(float(r.headers["Retry-After"]))
+            continue
+        break
+    throttle(r)
     if r.status_code not in (200, 201):
         raise RuntimeError(
             f"Create issue failed: {r.status_code} {r.text[:200]}")
     return r.json()
 
 
-def add_issue_to_project(project_id: str, node_id: str):
-    if DRY_RUN:
+def add_issues_to_project(project_id: str, node_ids: List[str]):
+    """Add all node ids to the project in one GraphQL document (one alias per item)."""
+    if DRY_RUN or not node_ids:
         return
-    m = """
-    mutation($pid:ID!, $cid:ID!){ addProjectV2ItemById(input:{projectId:$pid, contentId:$cid}) { item { id } } }
+    decls = ", ".join(["$pid:ID!"] + [f"$c{i}:ID!" for i in range(len(node_ids))])
+    fields = "\n      ".join(
+        f"add{i}: addProjectV2ItemById(input:{{projectId:$pid, contentId:$c{i}}}) {{ item {{ id }} }}"
+        for i in range(len(node_ids)))
+    m = f"""
+    mutation({decls}){{
+      {fields}
+    }}
     """
-    gql(m, {"pid": project_id, "cid": node_id})
-
-
-def fetch_issue_node_id(number: int) -> str:
-    q = """
-    query($owner:String!, $repo:String!, $number:Int!){ repository(owner:$owner,name:$repo){ issue(number:$number){ id } } }
-    """
-    owner, repo = REPO_NAME.split("/")
-    d = gql(q, {"owner": owner, "repo": repo, "number": number})
-    issue_obj = d["data"]["repository"].get("issue")
-    if not issue_obj:
-        raise RuntimeError(f"Cannot resolve node id for issue #{number}")
-    return issue_obj["id"]
+    variables: Dict[str, Any] = {"pid": project_id}
+    variables.update({f"c{i}": nid for i, nid in enumerate(node_ids)})
+    gql(m, variables)
 
 
-def append_checklist(parent_number: int, new_child_numbers: List[int]):
-    if not new_child_numbers:
+def append_checklist(parent_number: int, new_children: List[Tuple[int, str]]):
+    """Append (number, title) checklist lines; titles come from the create responses."""
+    if not new_children:
         return
     # Fetch parent (REST)
-    r = requests.get(
-        f"https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}", headers=REST_HEADERS, timeout=30)
+    r = SESSION.get(
+        f"https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}", timeout=30)
     if r.status_code != 200:
         raise RuntimeError(
             f"Parent fetch failed: {r.status_code} {r.text[:120]}")
     parent = r.json()
     body = parent.get("body") or ""
     existing_nums = extract_existing_child_numbers(body)
-    add_nums = [n for n in new_child_numbers if n not in existing_nums]
-    if not add_nums:
+    new_lines = [f"- [ ] #{n} — {title}"
+                 for n, title in new_children if n not in existing_nums]
+    if not new_lines:
         return
-    lines = body.rstrip().splitlines()
-    if lines and lines[-1].strip() != "":
-        lines.append("")
-    if not any(l.strip().lower().startswith("### sub-issues") for l in lines):
-        lines.append("### Sub-issues")
-    # fetch child titles for each
-    for n in add_nums:
-        if DRY_RUN:
-            title = "(DRY_RUN)"
-        else:
-            cr = requests.get(
-                f"https://api.github.com/repos/{REPO_NAME}/issues/{n}", headers=REST_HEADERS, timeout=30)
-            if cr.status_code != 200:
-                title = "(title unavailable)"
-            else:
-                title = cr.json().get("title", "(no title)")
-        lines.append(f"- [ ] #{n} — {title}")
-    new_body = "\n".join(lines).rstrip() + "\n"
+    existing_block = body.rstrip()
+    has_header = any(l.strip().lower().startswith("### sub-issues")
+                     for l in existing_block.splitlines())
+    new_body = ((existing_block + "\n\n" if existing_block else "")
+                + ("" if has_header else "### Sub-issues\n")
+                + "\n".join(new_lines) + "\n")
     if DRY_RUN:
-        sys.stderr.write(
-            f"DRY_RUN: would update parent #{parent_number} body with {len(add_nums)} checklist lines.\n")
+        logger.info(
+            f"DRY_RUN: would update parent #{parent_number} body with {len(new_lines)} checklist lines.")
         return
-    er = requests.patch(f"https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}",
-                        headers=REST_HEADERS, json={"body": new_body}, timeout=30)
+    er = SESSION.patch(f"https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}",
+                       json={"body": new_body}, timeout=30)
     if er.status_code not in (200, 201):
         raise RuntimeError(
             f"Failed to update parent checklist: {er.status_code} {er.text[:120]}")
 
 
 def extract_existing_child_numbers(parent_body: str) -> Set[int]:
-    pat = re.compile(r"^- \[.\] #(?P<num>\d+)", re.MULTILINE)
     nums: Set[int] = set()
-    for m in pat.finditer(parent_body or ""):
+    for m in CHECKLIST_RE.finditer(parent_body or ""):
         try:
             nums.add(int(m.group("num")))
         except ValueError:
@@ -281,41 +442,39 @@ def extract_existing_child_numbers(parent_body: str) -> Set[int]:
 def main():
     parent_issue_number = resolve_parent_issue_number()
     tasks = read_tasks_from_stdin()
-    sys.stderr.write(f"Parent issue: #{parent_issue_number}\n")
-    sys.stderr.write(f"Incoming tasks: {len(tasks)}\n")
+    logger.info(f"Parent issue: #{parent_issue_number}")
+    logger.info(f"Incoming tasks: {len(tasks)}")
 
     try:
-        all_issues = list_repo_issues()
+        parent_issue, existing_map = fetch_parent_and_subissues(
+            parent_issue_number)
+        # the search index lags writes; a just-touched parent may have unindexed children
+        if not existing_map and recently_updated(parent_issue):
+            existing_map = existing_subissue_titles(
+                parent_issue_number, list_repo_issues())
     except Exception as e:
-        sys.stderr.write(f"ERROR fetching repo issues: {e}\n")
+        logger.error(f"ERROR fetching repo issues: {e}")
         sys.exit(2)
-
-    try:
-        parent_issue = get_parent_issue(parent_issue_number, all_issues)
-    except Exception as e:
-        sys.stderr.write(str(e) + "\n")
-        sys.exit(2)
-
-    existing_map = existing_subissue_titles(parent_issue_number, all_issues)
-    sys.stderr.write(f"Existing sub-issues detected: {len(existing_map)}\n")
+    logger.info(f"Existing sub-issues detected: {len(existing_map)}")
 
     # Determine project id for adding new issues
     try:
         project_id = get_project_id()
     except Exception as e:
-        sys.stderr.write(f"ERROR resolving project id: {e}\n")
+        logger.error(f"ERROR resolving project id: {e}")
         sys.exit(2)
 
-    new_child_numbers: List[int] = []
+    new_children: List[Tuple[int, str]] = []
+    new_node_ids: List[str] = []
     created = 0
     skipped = 0
     for task in tasks:
         raw_title = task["title"].strip()
-        issue_title = ISSUE_TITLE_PREFIX_TEMPLATE.format(
-            parent=parent_issue_number, title=raw_title)
-        if issue_title in existing_map:
+        if raw_title in existing_map:
             skipped += 1
             continue
+        issue_title = ISSUE_TITLE_PREFIX_TEMPLATE.format(
+            parent=parent_issue_number, title=raw_title)
         body_lines = [
             f"Derived from parent Story #{parent_issue_number}: {parent_issue.get('title')}",
             f"PARENT-STORY: #{parent_issue_number}",
@@ -326,28 +485,32 @@ def main():
         try:
             issue_json = create_issue(issue_title, body)
             number_created = issue_json["number"] if not DRY_RUN else -1
-            # fetch node id (GraphQL) only if real
+            # REST create response already carries the GraphQL node id
             if not DRY_RUN:
-                node_id = fetch_issue_node_id(number_created)
-                add_issue_to_project(project_id, node_id)
-                new_child_numbers.append(number_created)
+                new_node_ids.append(issue_json["node_id"])
+                new_children.append((number_created, issue_json["title"]))
             created += 1
-            sys.stderr.write(f"Created sub-issue: {issue_title}\n")
-            if not DRY_RUN:
-                time.sleep(RATE_DELAY)
+            logger.info(f"Created sub-issue: {issue_title}")
+        except Exception as e:
+            logger.error(
+                f"ERROR creating sub-issue '{issue_title}': {e}")
+    logger.info(
+        f"Summary: created {created}, skipped {skipped} (already exist).")
+
+    # Add all new sub-issues to the project in one batched mutation
+    if new_node_ids:
+        try:
+            add_issues_to_project(project_id, new_node_ids)
         except Exception as e:
-            sys.stderr.write(
-                f"ERROR creating sub-issue '{issue_title}': {e}\n")
-    sys.stderr.write(
-        f"Summary: created {created}, skipped {skipped} (already exist).\n")
+            logger.warning(f"WARNING: adding sub-issues to project failed: {e}")
 
     # Update parent checklist
     try:
-        append_checklist(parent_issue_number, new_child_numbers)
+        append_checklist(parent_issue_number, new_children)
     except Exception as e:
-        sys.stderr.write(f"WARNING: checklist update failed: {e}\n")
+        logger.warning(f"WARNING: checklist update failed: {e}")
 
-    sys.stderr.write("Done.\n")
+    logger.info("Done.")
 
 
 if __name__ == "__main__":
@@ -8,7 +8,7 @@ Combines Steps 1–3:
        - Optionally skip if any sub-issues already exist (SKIP_IF_HAS_SUBISSUES=1)
        - Call GPT to decompose (idempotent: only create missing sub-issues)
        - Add new sub-issues to project
-       - Append checklist entries in parent body for new sub-issues only
+       - Append new sub-issues to the parent checklist and link them as native sub-issues
 
 Environment Variables:
   GITHUB_TOKEN / GITHUB_TOKEN_FG   required
@@ -19,7 +19,10 @@ Environment Variables:
   TEMPERATURE                      default: 0.2
   MAX_TASKS                        default: 12
   DRY_RUN=1                        no writes
-  RATE_DELAY=0.3                   delay between writes
+  RATE_DELAY=0                     optional fixed spacing between write starts
+  RATE_BUFFER=100                  below this many remaining calls, wait for the reset
+  CREATE_WORKERS=5                 concurrent sub-issue creations (all parents)
+  GPT_CONCURRENCY=4                parents decomposed (streamed) at once
   ONLY_ISSUES=comma list           restrict to these issue numbers
   START_AT                         skip parents with number < START_AT
   MAX_PARENTS                      stop after processing N parents (for testing)
@@ -41,15 +44,22 @@ from __future__ import annotations
 import os
 import sys
 import time
-import json
 import re
+import random
+import asyncio
+import hashlib
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Tuple, AsyncIterator
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from _gpt_models import LEGACY_JSON_MODELS
+from _jsonio import dumps, loads
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     _USE_NEW_CLIENT = True
 except ImportError:
     from importlib import import_module
@@ -69,11 +79,18 @@ MODEL = os.getenv('MODEL', 'gpt-3.5-turbo')
 TEMPERATURE = float(os.getenv('TEMPERATURE', '0.2'))
 MAX_TASKS = int(os.getenv('MAX_TASKS', '12'))
 DRY_RUN = os.getenv('DRY_RUN') == '1'
-RATE_DELAY = float(os.getenv('RATE_DELAY', '0.3'))
+RATE_DELAY = float(os.getenv('RATE_DELAY', '0'))
+RATE_BUFFER = int(os.getenv('RATE_BUFFER', '100'))
+CREATE_WORKERS = int(os.getenv('CREATE_WORKERS', '5'))
+PROJECT_BATCH = 20  # aliased project-add mutations per GraphQL request
+MAX_ATTEMPTS = 6  # writes: 1 try + backoff of ~1,2,4,8,16s (capped at BACKOFF_CAP)
+BACKOFF_CAP = 32.0
+GPT_CONCURRENCY = int(os.getenv('GPT_CONCURRENCY', '4'))
 STORY_PREFIX = os.getenv('STORY_PREFIX', 'Story #')  # used in sub-issue titles
 SKIP_IF_HAS_SUBISSUES = os.getenv('SKIP_IF_HAS_SUBISSUES') == '1'
 CACHE_TASKS = os.getenv('CACHE_TASKS') == '1'
-REGENERATE_TASKS = os.getenv('REGENERATE_TASKS') == '1'
+REGENERATE_TASKS = os.getenv('REGENERATE_TASKS') == '1'  # re-roll: skip cached tasks, still save
+PROMPT_VERSION = 'v2'  # bump when the _gpt_prompt text changes to invalidate cached tasks
 CACHE_DIR = Path(os.getenv('CACHE_DIR', '.story_decomp_cache'))
 
 TOKEN = os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_TOKEN_FG')
@@ -86,19 +103,27 @@ if not OPENAI_KEY:
     sys.exit(1)
 
 if _USE_NEW_CLIENT:
-    client = OpenAI(api_key=OPENAI_KEY)
+    client = AsyncOpenAI(api_key=OPENAI_KEY)
 else:
     if openai is None:
         sys.stderr.write('ERROR: openai library not available.\n')
         sys.exit(1)
     openai.api_key = OPENAI_KEY
+JSON_MODE = _USE_NEW_CLIENT and not MODEL.startswith(LEGACY_JSON_MODELS)
 
 REPO_NAME = f'{USERNAME}/owl-client-relationship'
 REST_HEADERS = {'Authorization': f'token {TOKEN}',
                 'Accept': 'application/vnd.github+json'}
 GQL_ENDPOINT = 'https://api.github.com/graphql'
 GQL_HEADERS = {'Authorization': f'bearer {TOKEN}',
-               'Accept': 'application/vnd.github+json'}
+               'Accept': 'application/vnd.github+json',
+               'Content-Type': 'application/json'}  # payloads are pre-encoded by _jsonio.dumps
+# Shared keep-alive session: one TLS handshake per pooled connection for the whole run
+SESSION = requests.Session()
+SESSION.headers.update(REST_HEADERS)
+SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])))
+SESSION.hooks['response'].append(lambda r, *a, **kw: _update_budget(r))
 
 ONLY_ISSUES_ENV = os.getenv('ONLY_ISSUES')
 ONLY_ISSUES: Set[int] = set()
@@ -111,14 +136,95 @@ if ONLY_ISSUES_ENV:
 START_AT = int(os.getenv('START_AT', '0'))
 MAX_PARENTS = int(os.getenv('MAX_PARENTS', '0'))  # 0 = no limit
 
+STORY_RE = re.compile(r'^Story #(\d+) – (.+)$')
+CHILD_RE = re.compile(r'^- \[.\] #(\d+)', re.MULTILINE)
+JSON_ARRAY_RE = re.compile(r'(\[.*\])', re.DOTALL)
+SUBISSUES_HEADER_RE = re.compile(r'^\s*### sub-issues', re.IGNORECASE | re.MULTILINE)
+
 # ---------- Helpers ----------
 
 
-def gql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-    r = requests.post(GQL_ENDPOINT, json={
-                      'query': query, 'variables': variables}, headers=GQL_HEADERS)
+class RateLimiter:
+    """Space acquire() returns at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+WRITE_LIMITER = RateLimiter(RATE_DELAY)
+
+# primary rate-limit budget per resource ('core' = REST, 'graphql'), fed by SESSION's hook
+_budget: Dict[str, Dict[str, int]] = {}
+
+
+def _update_budget(resp: requests.Response, *args, **kwargs):
+    remaining = resp.headers.get('X-RateLimit-Remaining')
+    reset = resp.headers.get('X-RateLimit-Reset')
+    if remaining is not None and reset is not None:
+        _budget[resp.headers.get('X-RateLimit-Resource', 'core')] = {
+            'remaining': int(remaining), 'reset': int(reset)}
+
+
+def _throttle(resource: str = 'core'):
+    """No delay while the budget is healthy; below RATE_BUFFER, sleep until the window resets."""
+    b = _budget.get(resource)
+    if b and b['remaining'] < RATE_BUFFER:
+        wait = b['reset'] - time.time() + 1
+        if wait > 0:
+            sys.stderr.write(
+                f'  Rate budget low ({b["remaining"]} {resource} left); sleeping {wait:.0f}s\n')
+            time.sleep(wait)
+
+
+def _is_transient(r: requests.Response, retry_5xx: bool = True) -> bool:
+    if r.status_code >= 500:
+        return retry_5xx
+    # secondary rate limits come back as 403/429, usually with Retry-After
+    return r.status_code in (403, 429) and (
+        'Retry-After' in r.headers or 'secondary rate limit' in r.text.lower())
+
+
+def send_with_backoff(method: str, url: str, retry_5xx: bool = True, **kwargs) -> requests.Response:
+    """SESSION.request, retrying 5xx and secondary rate limits with jittered exponential backoff.
+
+    urllib3's Retry skips non-idempotent POST/PATCH, so writes get their own loop here.
+    Pass retry_5xx=False for writes that must not repeat: GitHub often applies the write
+    before answering 5xx, so only rate-limit rejections (never applied) are resent.
+    """
+    kwargs.setdefault('timeout', 30)
+    for attempt in range(MAX_ATTEMPTS):
+        r = SESSION.request(method, url, **kwargs)
+        if not _is_transient(r, retry_5xx) or attempt == MAX_ATTEMPTS - 1:
+            return r
+        try:
+            wait = float(r.headers['Retry-After'])
+        except (KeyError, ValueError):
+            wait = min(BACKOFF_CAP, 2 ** attempt) * random.uniform(0.5, 1.0)
+        sys.stderr.write(
+            f'  {method} {r.status_code}; retry {attempt + 1}/{MAX_ATTEMPTS - 1} in {wait:.1f}s\n')
+        time.sleep(wait)
+    return r
+
+
+def gql(query: str, variables: Dict[str, Any], features: str | None = None) -> Dict[str, Any]:
+    _throttle('graphql')
+    headers = {**GQL_HEADERS, 'GraphQL-Features': features} if features else GQL_HEADERS
+    # mutations are not resent on 5xx (the write may already have applied)
+    r = send_with_backoff('POST', GQL_ENDPOINT, data=dumps({
+                          'query': query, 'variables': variables}), headers=headers,
+                          retry_5xx=not query.lstrip().startswith('mutation'))
     try:
-        data = r.json()
+        data = loads(r.content)
     except ValueError:
         raise RuntimeError(
             f'Non-JSON GraphQL response {r.status_code}: {r.text[:200]}')
@@ -137,132 +243,187 @@ def get_project_id() -> str:
     return proj['id']
 
 
-def fetch_project_issue_items() -> List[Dict[str, Any]]:
-    issues: List[Dict[str, Any]] = []
+def fetch_repo_and_project_issues() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """One traversal of repository issues -> (project parents, all repo issues).
+
+    GraphQL `issues` never includes PRs; parents are the issues whose projectItems
+    include this user's project PROJECT_NUMBER.
+    """
+    parents: List[Dict[str, Any]] = []
+    out: List[Dict[str, Any]] = []
     cursor = None
+    owner, repo = REPO_NAME.split('/')
     q = """
-    query($login:String!, $num:Int!, $cursor:String){
-      user(login:$login){ projectV2(number:$num){ items(first:100, after:$cursor){ pageInfo{hasNextPage endCursor} nodes{ content{ __typename ... on Issue { id number title body url state } } } } } }
+    query($o:String!, $r:String!, $cursor:String){
+      repository(owner:$o, name:$r){ issues(first:100, after:$cursor, states:[OPEN, CLOSED]){ pageInfo{hasNextPage endCursor} nodes{ number title id projectItems(first:10){ nodes{ project{ number owner{ ... on User { login } } } } } } } }
     }
     """
     while True:
-        d = gql(q, {'login': USERNAME, 'num': PROJECT_NUMBER, 'cursor': cursor})
-        items = d['data']['user']['projectV2']['items']
-        for node in items['nodes']:
-            c = node.get('content')
-            if c and c.get('__typename') == 'Issue':
-                issues.append({
-                    'number': c['number'],
-                    'title': c['title'],
-                    'body': c.get('body') or '',
-                    'url': c.get('url'),
-                    'state': c.get('state'),
-                    'id': c['id'],  # node id
-                })
-        if not items['pageInfo']['hasNextPage']:
+        d = gql(q, {'o': owner, 'r': repo, 'cursor': cursor})
+        issues = d['data']['repository']['issues']
+        for c in issues['nodes']:
+            issue = {
+                'number': c['number'],
+                'title': c['title'],
+                'id': c['id'],  # node id; body is loaded per processed parent
+            }
+            out.append(issue)
+            if any(pi['project']['number'] == PROJECT_NUMBER
+                   and (pi['project'].get('owner') or {}).get('login') == USERNAME
+                   for pi in c['projectItems']['nodes'] if pi.get('project')):
+                parents.append(issue)
+        if not issues['pageInfo']['hasNextPage']:
             break
-        cursor = items['pageInfo']['endCursor']
-    return issues
+        cursor = issues['pageInfo']['endCursor']
+    return parents, out
 
 
-def list_repo_issues() -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    page = 1
-    while True:
-        r = requests.get(f'https://api.github.com/repos/{REPO_NAME}/issues', params={
-                         'state': 'all', 'per_page': 100, 'page': page}, headers=REST_HEADERS, timeout=30)
-        if r.status_code != 200:
-            raise RuntimeError(
-                f'Issues fetch failed page {page}: {r.status_code} {r.text[:120]}')
-        batch = r.json()
-        if not batch:
-            break
-        for it in batch:
-            if 'pull_request' in it:
-                continue
-            out.append(it)
-        page += 1
-    return out
+def fetch_issue_body(number: int) -> str:
+    q = 'query($o:String!,$r:String!,$n:Int!){ repository(owner:$o,name:$r){ issue(number:$n){ body } } }'
+    owner, repo = REPO_NAME.split('/')
+    d = gql(q, {'o': owner, 'r': repo, 'n': number})
+    return ((d['data']['repository'] or {}).get('issue') or {}).get('body') or ''
 
 
-def existing_subissue_titles_for(parent_number: int, repo_issues: List[Dict[str, Any]]) -> Dict[str, int]:
-    pat = re.compile(rf'^Story #{parent_number} – ')
-    mapping: Dict[str, int] = {}
+def index_subissues(repo_issues: List[Dict[str, Any]]) -> Dict[int, Dict[str, int]]:
+    """One pass over repo issues: parent number -> {sub-issue title: issue number}."""
+    index: Dict[int, Dict[str, int]] = {}
     for it in repo_issues:
         t = it.get('title', '')
-        if pat.match(t):
-            mapping[t] = it['number']
-    return mapping
-
-
-def parent_has_any_subissue(parent_number: int, repo_issues: List[Dict[str, Any]]) -> bool:
-    pat = re.compile(rf'^Story #{parent_number} – ')
-    return any(pat.match(it.get('title', '')) for it in repo_issues)
+        m = STORY_RE.match(t)
+        if m:
+            index.setdefault(int(m.group(1)), {})[t] = it['number']
+    return index
 
 
-def fetch_issue_node_id(number: int) -> str:
-    q = 'query($o:String!,$r:String!,$n:Int!){ repository(owner:$o,name:$r){ issue(number:$n){ id } } }'
-    owner, repo = REPO_NAME.split('/')
-    d = gql(q, {'o': owner, 'r': repo, 'n': number})
-    issue_obj = d['data']['repository'].get('issue')
-    if not issue_obj:
-        raise RuntimeError(f'Cannot resolve node id for issue #{number}')
-    return issue_obj['id']
-
-
-def call_gpt(title: str, body: str) -> List[Dict[str, str]]:
+def _gpt_prompt(title: str, body: str) -> str:
     story_text = f'TITLE: {title}\n\nBODY:\n{body}'.strip()
-    prompt = (
+    shape = ('Return a JSON object {"tasks": [...]}. ' if JSON_MODE
+             else 'Return ONLY a JSON array, no commentary. ')
+    return (
         'You are an assistant splitting a GitHub issue (user story) into actionable development tasks. '
-        'Return ONLY a JSON array, no commentary. Each element MUST have "title" and "description". '
+        + shape + 'Each task MUST have "title" and "description". '
         f'Limit to at most {MAX_TASKS} tasks. Titles <= 70 chars. Avoid duplicates.\n\n' + story_text
     )
-    if _USE_NEW_CLIENT:
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[{'role': 'user', 'content': prompt}],
-            temperature=TEMPERATURE,
-            max_tokens=700,
-        )
-        content = resp.choices[0].message.content.strip()
-    else:
-        resp = openai.ChatCompletion.create(
-            model=MODEL,
-            messages=[{'role': 'user', 'content': prompt}],
-            temperature=TEMPERATURE,
-            max_tokens=700,
-        )
-        content = resp.choices[0].message.content.strip()
-    m = re.search(r'(\[.*\])', content, re.DOTALL)
-    if not m:
-        return []
+
+
+def _task_from(item: Any) -> Dict[str, str] | None:
+    if not isinstance(item, dict):
+        return None
+    t = (item.get('title') or item.get('name') or '').strip()
+    dsc = (item.get('description') or '').strip()
+    return {'title': t, 'description': dsc} if t else None
+
+
+class JsonObjectSplitter:
+    """Incrementally find complete JSON objects that sit directly inside an array.
+
+    Tracks bracket depth and string/escape state across fed chunks, so each task object
+    of `[{...}, ...]` or `{"tasks": [{...}, ...]}` is emitted as soon as its `}` arrives.
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.in_str = False
+        self.esc = False
+        self.capture_at: int | None = None
+        self.buf: List[str] = []
+
+    def feed(self, text: str) -> List[str]:
+        out: List[str] = []
+        for ch in text:
+            if self.capture_at is not None:
+                self.buf.append(ch)
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == '\\':
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+                continue
+            if ch == '"':
+                self.in_str = True
+            elif ch in '[{':
+                if ch == '{' and self.capture_at is None and self.stack and self.stack[-1] == '[':
+                    self.capture_at = len(self.stack)
+                    self.buf = ['{']
+                self.stack.append(ch)
+            elif ch in ']}':
+                if self.stack:
+                    self.stack.pop()
+                if ch == '}' and self.capture_at is not None and len(self.stack) == self.capture_at:
+                    out.append(''.join(self.buf))
+                    self.capture_at = None
+                    self.buf = []
+        return out
+
+
+async def stream_gpt_tasks(title: str, body: str) -> AsyncIterator[Dict[str, str]]:
+    """Yield tasks one by one while the completion is still streaming (at most MAX_TASKS)."""
+    prompt = _gpt_prompt(title, body)
+    kwargs: Dict[str, Any] = {
+        'model': MODEL,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'temperature': TEMPERATURE,
+        'max_tokens': 700,
+    }
+    count = 0
+    if not _USE_NEW_CLIENT:  # legacy SDK: no async client; parse the whole reply
+        resp = await asyncio.to_thread(openai.ChatCompletion.create, **kwargs)
+        m = JSON_ARRAY_RE.search(resp.choices[0].message.content.strip())
+        try:
+            data = loads(m.group(1)) if m else []
+        except ValueError:
+            data = []
+        for item in data if isinstance(data, list) else []:
+            task = _task_from(item)
+            if task and count < MAX_TASKS:
+                count += 1
+                yield task
+        return
+    if JSON_MODE:  # server-side guarantee of valid JSON
+        kwargs['response_format'] = {'type': 'json_object'}
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    splitter = JsonObjectSplitter()
     try:
-        data = json.loads(m.group(1))
-    except Exception:
-        return []
-    tasks: List[Dict[str, str]] = []
-    if isinstance(data, list):
-        for item in data:
-            if isinstance(item, dict):
-                t = (item.get('title') or item.get('name') or '').strip()
-                dsc = (item.get('description') or '').strip()
-                if t:
-                    tasks.append({'title': t, 'description': dsc})
-    return tasks[:MAX_TASKS]
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            for raw in splitter.feed(chunk.choices[0].delta.content or ''):
+                try:
+                    task = _task_from(loads(raw))
+                except ValueError:
+                    continue
+                if task:
+                    count += 1
+                    yield task
+                    if count >= MAX_TASKS:
+                        return
+    finally:
+        await stream.close()
+
 
+async def _iter_list(items: List[Dict[str, str]]) -> AsyncIterator[Dict[str, str]]:
+    for item in items:
+        yield item
 
-def cache_path_for(parent_number: int) -> Path:
-    return CACHE_DIR / f'{parent_number}.tasks.json'
 
+def cache_path_for(title: str, body: str) -> Path:
+    """Key by everything that shapes the GPT output, so edited parents miss the cache."""
+    key = hashlib.sha256(
+        f'{MODEL}|{TEMPERATURE}|{MAX_TASKS}|{PROMPT_VERSION}|{title}|{body}'.encode()).hexdigest()
+    return CACHE_DIR / f'{key}.json'
 
-def load_cached_tasks(parent_number: int) -> List[Dict[str, str]]:
+
+def load_cached_tasks(title: str, body: str) -> List[Dict[str, str]]:
     if not CACHE_TASKS:
         return []
-    p = cache_path_for(parent_number)
+    p = cache_path_for(title, body)
     if not p.exists():
         return []
     try:
-        data = json.loads(p.read_text())
+        data = loads(p.read_bytes())
         if isinstance(data, list):
             out = []
             for item in data:
@@ -275,79 +436,159 @@ def load_cached_tasks(parent_number: int) -> List[Dict[str, str]]:
     return []
 
 
-def save_cached_tasks(parent_number: int, tasks: List[Dict[str, str]]):
+def save_cached_tasks(parent_number: int, title: str, body: str, tasks: List[Dict[str, str]]):
     if not CACHE_TASKS:
         return
     try:
         CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        cache_path_for(parent_number).write_text(json.dumps(tasks, indent=2))
+        cache_path_for(title, body).write_bytes(dumps(tasks))
     except Exception as e:
         sys.stderr.write(
             f'  WARNING: failed to write cache for parent {parent_number}: {e}\n')
 
 
+def find_recent_issue(title: str) -> Dict[str, Any] | None:
+    """Newest repo issue with exactly this title (the listing is not search-index delayed)."""
+    r = SESSION.get(f'https://api.github.com/repos/{REPO_NAME}/issues',
+                    params={'state': 'all', 'sort': 'created', 'direction': 'desc', 'per_page': 30},
+                    timeout=30)
+    if r.status_code != 200:
+        return None
+    return next((it for it in loads(r.content)
+                 if it.get('title') == title and 'pull_request' not in it), None)
+
+
 def create_issue(title: str, body: str) -> Dict[str, Any]:
     if DRY_RUN:
         return {'number': -1, 'title': title, 'body': body}
-    r = requests.post(f'https://api.github.com/repos/{REPO_NAME}/issues',
-                      headers=REST_HEADERS, json={'title': title, 'body': body}, timeout=30)
+    for attempt in range(MAX_ATTEMPTS):
+        r = send_with_backoff('POST', f'https://api.github.com/repos/{REPO_NAME}/issues',
+                              retry_5xx=False, json={'title': title, 'body': body})
+        if r.status_code < 500 or attempt == MAX_ATTEMPTS - 1:
+            break
+        # the create may have landed before the 5xx: resend only if the title isn't there
+        landed = find_recent_issue(title)
+        if landed:
+            return landed
+        wait = min(BACKOFF_CAP, 2 ** attempt) * random.uniform(0.5, 1.0)
+        sys.stderr.write(f'  POST {r.status_code}; "{title}" not found, retry in {wait:.1f}s\n')
+        time.sleep(wait)
     if r.status_code not in (200, 201):
         raise RuntimeError(
             f'Create issue failed: {r.status_code} {r.text[:140]}')
-    return r.json()
+    return loads(r.content)
 
 
-def add_to_project(project_id: str, node_id: str):
+def add_many_to_project(project_id: str, node_ids: List[str]):
+    """Add items via aliased addProjectV2ItemById mutations, PROJECT_BATCH per request."""
     if DRY_RUN:
         return
-    m = 'mutation($pid:ID!,$cid:ID!){ addProjectV2ItemById(input:{projectId:$pid,contentId:$cid}){ item { id } } }'
-    gql(m, {'pid': project_id, 'cid': node_id})
+    for start in range(0, len(node_ids), PROJECT_BATCH):
+        chunk = node_ids[start:start + PROJECT_BATCH]
+        decls = ','.join(['$pid:ID!'] + [f'$c{i}:ID!' for i in range(len(chunk))])
+        fields = ' '.join(
+            f'a{i}: addProjectV2ItemById(input:{{projectId:$pid,contentId:$c{i}}}){{ item {{ id }} }}'
+            for i in range(len(chunk)))
+        variables: Dict[str, Any] = {'pid': project_id}
+        variables.update({f'c{i}': nid for i, nid in enumerate(chunk)})
+        gql(f'mutation({decls}){{ {fields} }}', variables)
 
 
-def append_checklist(parent_number: int, new_child_numbers: List[int]):
-    if not new_child_numbers:
-        return
-    r = requests.get(
-        f'https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}', headers=REST_HEADERS, timeout=30)
+def link_sub_issues(parent_node_id: str, child_node_ids: List[str]) -> int:
+    """Attach children as native sub-issues: aliased addSubIssue mutations, no body read.
+
+    Returns how many were linked before any failure (batches run in order).
+    """
+    if DRY_RUN or not child_node_ids:
+        return len(child_node_ids)
+    linked = 0
+    for start in range(0, len(child_node_ids), PROJECT_BATCH):
+        chunk = child_node_ids[start:start + PROJECT_BATCH]
+        decls = ','.join(['$p:ID!'] + [f'$c{i}:ID!' for i in range(len(chunk))])
+        fields = ' '.join(
+            f's{i}: addSubIssue(input:{{issueId:$p,subIssueId:$c{i}}}){{ subIssue {{ id }} }}'
+            for i in range(len(chunk)))
+        variables: Dict[str, Any] = {'p': parent_node_id}
+        variables.update({f'c{i}': nid for i, nid in enumerate(chunk)})
+        try:
+            gql(f'mutation({decls}){{ {fields} }}', variables, features='sub_issues')
+        except Exception as e:
+            sys.stderr.write(f'  addSubIssue failed after {linked} linked: {e}\n')
+            return linked
+        linked += len(chunk)
+    return linked
+
+
+# url -> (etag, parsed body); a 304 replay doesn't count against the primary rate limit
+_etag_cache: Dict[str, Tuple[str, Any]] = {}
+
+
+def get_json_cached(url: str) -> Any:
+    cached = _etag_cache.get(url)
+    headers = {'If-None-Match': cached[0]} if cached else {}
+    r = SESSION.get(url, headers=headers, timeout=30)
+    if r.status_code == 304 and cached:
+        return cached[1]
     if r.status_code != 200:
-        raise RuntimeError(
-            f'Parent fetch failed: {r.status_code} {r.text[:120]}')
-    parent = r.json()
+        raise RuntimeError(f'GET failed: {r.status_code} {r.text[:120]}')
+    data = loads(r.content)
+    if r.headers.get('ETag'):
+        _etag_cache[url] = (r.headers['ETag'], data)
+    return data
+
+
+def fetch_issue_titles(node_ids: List[str]) -> Dict[int, str]:
+    """Batch title lookup: one nodes(ids:) query instead of a GET per issue."""
+    if DRY_RUN or not node_ids:
+        return {}
+    q = 'query($ids:[ID!]!){ nodes(ids:$ids){ ... on Issue { number title } } }'
+    d = gql(q, {'ids': node_ids})
+    return {n['number']: n['title'] for n in d['data']['nodes'] if n and 'number' in n}
+
+
+def append_checklist(parent_number: int, new_children: Dict[int, str],
+                     child_node_ids: List[str] | None = None):
+    """Append checklist lines for {number: title}.
+
+    Titles normally come from the create responses; children known only by node id
+    are resolved in one batched GraphQL query.
+    """
+    if DRY_RUN:  # before the parent read: a rehearsal has nothing to diff against
+        count = len(new_children) + len(child_node_ids or [])
+        if count:
+            sys.stderr.write(
+                f'DRY_RUN: would update parent #{parent_number} checklist with up to {count} entries.\n')
+        return
+    if child_node_ids:
+        new_children = {**fetch_issue_titles(child_node_ids), **new_children}
+    if not new_children:
+        return
+    try:
+        parent = get_json_cached(
+            f'https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}')
+    except RuntimeError as e:
+        raise RuntimeError(f'Parent fetch failed: {e}')
     body = parent.get('body') or ''
     existing_nums = extract_existing_child_numbers(body)
-    add_nums = [n for n in new_child_numbers if n not in existing_nums]
+    add_nums = [n for n in new_children if n not in existing_nums]
     if not add_nums:
         return
-    lines = body.rstrip().splitlines()
-    if lines and lines[-1].strip() != '':
-        lines.append('')
-    if not any(l.strip().lower().startswith('### sub-issues') for l in lines):
-        lines.append('### Sub-issues')
-    for n in add_nums:
-        if DRY_RUN:
-            title = '(DRY_RUN)'
-        else:
-            cr = requests.get(
-                f'https://api.github.com/repos/{REPO_NAME}/issues/{n}', headers=REST_HEADERS, timeout=30)
-            title = cr.json().get(
-                'title', '(no title)') if cr.status_code == 200 else '(title unavailable)'
-        lines.append(f'- [ ] #{n} — {title}')
-    new_body = '\n'.join(lines).rstrip() + '\n'
-    if DRY_RUN:
-        sys.stderr.write(
-            f'DRY_RUN: would update parent #{parent_number} checklist with {len(add_nums)} entries.\n')
-        return
-    pr = requests.patch(f'https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}',
-                        headers=REST_HEADERS, json={'body': new_body}, timeout=30)
+    # only the appended suffix is built; the existing body is sent back untouched
+    head = body.rstrip()
+    if not SUBISSUES_HEADER_RE.search(head):
+        head += '\n\n### Sub-issues' if head else '### Sub-issues'
+    new_body = ''.join([head, '\n', '\n'.join(
+        f'- [ ] #{n} — {new_children[n]}' for n in add_nums), '\n'])
+    pr = send_with_backoff('PATCH', f'https://api.github.com/repos/{REPO_NAME}/issues/{parent_number}',
+                           json={'body': new_body})
     if pr.status_code not in (200, 201):
         raise RuntimeError(
             f'Checklist update failed: {pr.status_code} {pr.text[:120]}')
 
 
 def extract_existing_child_numbers(body: str) -> Set[int]:
-    pat = re.compile(r'^- \[.\] #(\d+)', re.MULTILINE)
     nums: Set[int] = set()
-    for m in pat.finditer(body or ''):
+    for m in CHILD_RE.finditer(body or ''):
         try:
             nums.add(int(m.group(1)))
         except ValueError:
@@ -355,100 +596,175 @@ def extract_existing_child_numbers(body: str) -> Set[int]:
     return nums
 
 
-def process_parent(project_id: str, parent: Dict[str, Any], repo_issues: List[Dict[str, Any]]) -> None:
+async def process_parent(project_id: str, parent: Dict[str, Any], subissues_by_parent: Dict[int, Dict[str, int]],
+                         gpt_sem: asyncio.Semaphore, github_sem: asyncio.Semaphore) -> None:
+    """Stream tasks from GPT (bounded by gpt_sem) and start each sub-issue create as soon as
+    its task arrives (creates across all parents bounded by github_sem)."""
     pnum = parent['number']
     if ONLY_ISSUES and pnum not in ONLY_ISSUES:
         return
     if pnum < START_AT:
         return
     sys.stderr.write(f'Parent #{pnum}: {parent["title"]}\n')
-    if SKIP_IF_HAS_SUBISSUES and parent_has_any_subissue(pnum, repo_issues):
+    if SKIP_IF_HAS_SUBISSUES and subissues_by_parent.get(pnum):
         sys.stderr.write('  Skipping (already has sub-issues)\n')
         return
-    existing_map = existing_subissue_titles_for(pnum, repo_issues)
-    tasks = []
-    if CACHE_TASKS and not REGENERATE_TASKS:
-        tasks = load_cached_tasks(pnum)
-        if tasks:
-            sys.stderr.write(f'  Loaded {len(tasks)} cached tasks.\n')
-    if not tasks:
-        tasks = call_gpt(parent['title'], parent['body'])
-        if tasks:
-            save_cached_tasks(pnum, tasks)
+    existing_map = subissues_by_parent.setdefault(pnum, {})
+    if 'body' not in parent:  # listing skips bodies: only processed parents pay for one
+        parent['body'] = await asyncio.to_thread(fetch_issue_body, pnum)
+    cached = load_cached_tasks(parent['title'], parent['body']) if CACHE_TASKS and not REGENERATE_TASKS else []
+    if cached:
+        sys.stderr.write(f'  #{pnum}: loaded {len(cached)} cached tasks.\n')
+
+    tasks: List[Dict[str, str]] = []
+    pending: List[Tuple[str, str]] = []
+    creates: List[asyncio.Task] = []
+    queued: Set[str] = set()
+    skipped = 0
+
+    async def create_async(item: Tuple[str, str]) -> Dict[str, Any] | None:
+        async with github_sem:
+            return await asyncio.to_thread(create_one, item)
+
+    async def consume(source: AsyncIterator[Dict[str, str]]):
+        nonlocal skipped
+        async for task in source:
+            tasks.append(task)
+            sub_title = f'{STORY_PREFIX}{pnum} – {task["title"]}' if not sub_issue_title_has_prefix(
+                task['title'], pnum) else task['title']
+            if sub_title in existing_map or sub_title in queued:
+                skipped += 1
+                continue
+            queued.add(sub_title)
+            body_lines = [
+                f'Derived from parent Story #{pnum}: {parent["title"]}',
+                f'PARENT-STORY: #{pnum}',
+                '',
+                task['description'] or '(no description provided)'
+            ]
+            item = (sub_title, '\n'.join(body_lines).rstrip() + '\n')
+            pending.append(item)
+            creates.append(asyncio.create_task(create_async(item)))
+
+    try:
+        if cached:
+            await consume(_iter_list(cached))
+        else:
+            async with gpt_sem:
+                await consume(stream_gpt_tasks(parent['title'], parent['body']))
+            if tasks:
+                save_cached_tasks(pnum, parent['title'], parent['body'], tasks)
+    except Exception as e:
+        # creates already started must still be recorded and linked, or the rerun skips
+        # them by title and they stay orphaned; a partial decomposition is not cached
+        sys.stderr.write(f'  ERROR generating tasks for #{pnum}: {e}\n')
     if not tasks:
-        sys.stderr.write('  No tasks generated.\n')
+        sys.stderr.write(f'  #{pnum}: no tasks generated.\n')
         return
-    created_numbers: List[int] = []
+    results = await asyncio.gather(*creates)
+    await asyncio.to_thread(finish_parent, project_id, parent, existing_map,
+                            pending, results, skipped)
+
+
+def create_one(item: Tuple[str, str]) -> Dict[str, Any] | None:
+    sub_title, body = item
+    try:
+        if not DRY_RUN:
+            _throttle()
+            if RATE_DELAY:
+                WRITE_LIMITER.acquire()
+        issue_json = create_issue(sub_title, body)
+        sys.stderr.write(f'  Created sub-issue: {sub_title}\n')
+        return issue_json
+    except Exception as e:
+        sys.stderr.write(
+            f'  ERROR creating sub-issue "{sub_title}": {e}\n')
+        return None
+
+
+def finish_parent(project_id: str, parent: Dict[str, Any], existing_map: Dict[str, int],
+                  pending: List[Tuple[str, str]], results: List[Dict[str, Any] | None],
+                  skipped: int) -> None:
+    """Record created sub-issues, add them to the project and link them to the parent."""
+    pnum = parent['number']
+    if DRY_RUN:
+        created = sum(1 for r in results if r is not None)
+        sys.stderr.write(
+            f'  #{pnum} summary: would create={created} skipped(existing)={skipped}\n')
+        return
+    created_children: Dict[int, str] = {}
+    node_ids: List[str] = []
     created = 0
-    skipped = 0
-    for task in tasks:
-        sub_title = f'{STORY_PREFIX}{pnum} – {task["title"]}' if not sub_issue_title_has_prefix(
-            task['title'], pnum) else task['title']
-        if sub_title in existing_map:
-            skipped += 1
+    for (sub_title, _), issue_json in zip(pending, results):
+        if issue_json is None:
             continue
-        body_lines = [
-            f'Derived from parent Story #{pnum}: {parent["title"]}',
-            f'PARENT-STORY: #{pnum}',
-            '',
-            task['description'] or '(no description provided)'
-        ]
-        body = '\n'.join(body_lines).rstrip() + '\n'
-        try:
-            issue_json = create_issue(sub_title, body)
-            if not DRY_RUN:
-                node_id = fetch_issue_node_id(issue_json['number'])
-                add_to_project(project_id, node_id)
-                created_numbers.append(issue_json['number'])
-            created += 1
-            sys.stderr.write(f'  Created sub-issue: {sub_title}\n')
-            if not DRY_RUN:
-                time.sleep(RATE_DELAY)
-        except Exception as e:
-            sys.stderr.write(
-                f'  ERROR creating sub-issue "{sub_title}": {e}\n')
+        created += 1
+        existing_map[sub_title] = issue_json['number']
+        created_children[issue_json['number']] = issue_json['title']
+        # REST create response already carries the GraphQL node id
+        node_ids.append(issue_json['node_id'])
+    try:
+        add_many_to_project(project_id, node_ids)
+    except Exception as e:
+        sys.stderr.write(f'  WARNING adding sub-issues to project failed: {e}\n')
     sys.stderr.write(
-        f'  Summary: created={created} skipped(existing)={skipped}\n')
+        f'  #{pnum} summary: created={created} skipped(existing)={skipped}\n')
+    # the body checklist stays the canonical record: the outline progress pass, the
+    # notebook templater and step3 all find children through '- [ ] #n' lines
     try:
-        append_checklist(pnum, created_numbers)
+        append_checklist(pnum, created_children)
     except Exception as e:
         sys.stderr.write(f'  WARNING checklist update failed: {e}\n')
+    # native sub-issue links are added alongside, best-effort
+    linked = link_sub_issues(parent['id'], node_ids)
+    if linked < len(node_ids):
+        sys.stderr.write(
+            f'  WARNING {len(node_ids) - linked} sub-issues not linked natively (checklist only)\n')
 
 
 def sub_issue_title_has_prefix(title: str, parent_number: int) -> bool:
     return title.startswith(f'Story #{parent_number} – ')
 
 
-def main():
+async def main_async():
     try:
-        project_id = get_project_id()
+        # the project id only feeds writes; a rehearsal never needs it
+        project_id = '' if DRY_RUN else get_project_id()
     except Exception as e:
         sys.stderr.write(f'ERROR resolving project id: {e}\n')
         sys.exit(2)
     try:
-        parents = fetch_project_issue_items()
+        parents, repo_issues = fetch_repo_and_project_issues()
     except Exception as e:
         sys.stderr.write(f'ERROR fetching project items: {e}\n')
         sys.exit(2)
-    try:
-        repo_issues = list_repo_issues()
-    except Exception as e:
-        sys.stderr.write(f'ERROR listing repo issues: {e}\n')
-        sys.exit(2)
+    # built once; process_parent records new sub-issues in it instead of refetching
+    subissues_by_parent = index_subissues(repo_issues)
 
     sys.stderr.write(
         f'Parents discovered: {len(parents)} (DRY_RUN={DRY_RUN})\n')
-    processed = 0
-    for parent in parents:
-        process_parent(project_id, parent, repo_issues)
-        if MAX_PARENTS and (processed := processed + 1) >= MAX_PARENTS:
-            sys.stderr.write('Reached MAX_PARENTS limit; stopping.\n')
-            break
-        # Refresh repo issues cache only if any creation happened (simple approach)
-        if not DRY_RUN:
-            repo_issues = list_repo_issues()
+    if MAX_PARENTS and len(parents) > MAX_PARENTS:
+        parents = parents[:MAX_PARENTS]
+        sys.stderr.write(f'MAX_PARENTS={MAX_PARENTS}: processing only the first {MAX_PARENTS}.\n')
+    # created here, inside the running loop, rather than at import time
+    gpt_sem = asyncio.Semaphore(GPT_CONCURRENCY)
+    github_sem = asyncio.Semaphore(CREATE_WORKERS)
+
+    async def run_parent(parent: Dict[str, Any]):
+        # one parent's failure must not cancel the others mid-create
+        try:
+            await process_parent(project_id, parent, subissues_by_parent, gpt_sem, github_sem)
+        except Exception as e:
+            sys.stderr.write(f'ERROR processing parent #{parent["number"]}: {e}\n')
+
+    # overlap model latency of some parents with GitHub writes of others
+    await asyncio.gather(*(run_parent(parent) for parent in parents))
     sys.stderr.write('Done.\n')
 
 
+def main():
+    asyncio.run(main_async())
+
+
 if __name__ == '__main__':
     main()
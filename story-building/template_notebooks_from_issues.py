@@ -2,7 +2,7 @@
 
 Data sources:
   * outline.md (Mermaid nodes) to map issue number -> notebook path
-  * GitHub issues API for parent issue body + sub-issue checklist
+  * GitHub GraphQL API for parent issue body + sub-issue checklist (batched, aliased issue fields)
 
 Notebook Template Structure (auto-managed portion):
   Cell 1 (markdown): Title header with link to parent issue
@@ -29,6 +29,7 @@ Environment Variables:
   OVERWRITE=1                      allow replacing existing notebooks
   INCLUDE_CODE_PLACEHOLDERS=1      add empty code cell after each sub-issue section
   MAX_SUBISSUES                    limit number of sub-issue sections (for brevity/testing)
+  FETCH_WORKERS                    default 8; concurrent REST fetches on the fallback path
 
 Limitations / Assumptions:
   * Parent issue body contains checklist lines of form '- [ ] #<num>' or '- [x] #<num>' optionally followed by an em dash and title.
@@ -41,15 +42,25 @@ import os
 import re
 import sys
 import json
-import uuid
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:  # optional: dump_notebook's stdlib fallback writes the same bytes, only slower
+    orjson = None
+from _issue_cache import get_issue as get_issue_cached
+from _outline_parse import outline_nodes
 
 ROOT = Path(__file__).resolve().parents[1]
-load_dotenv(ROOT / '.env')
+if not (os.environ.get('GITHUB_TOKEN') or os.environ.get('GITHUB_TOKEN_FG')):
+    # token already injected (CI): skip importing dotenv and reading .env
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / '.env')
 
 USERNAME = os.getenv('USERNAME', 'alexanderwiebe')
 TOKEN = os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_TOKEN_FG')
@@ -73,12 +84,20 @@ if not TOKEN:
     sys.exit(1)
 
 REPO_NAME = f'{USERNAME}/owl-client-relationship'
+OWNER, NAME = REPO_NAME.split('/')
 HEADERS = {"Authorization": f"token {TOKEN}", "Accept": "application/vnd.github+json"}
+GQL_ENDPOINT = 'https://api.github.com/graphql'
+GQL_BATCH = 50  # aliased issue(number:) fields per GraphQL query
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '8'))
+RATE_LOW_WATER = 50  # below this many remaining calls, sleep until the window resets
+# Shared keep-alive session: TLS is negotiated once per pooled connection
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', HTTPAdapter(pool_maxsize=FETCH_WORKERS))
 
-PARENT_ISSUE_RE = re.compile(r'^(?P<indent>\s*)(?P<node>P\w+)\["- \[[ x]\] \[[^\]]+\]\(https://github.com/[^/]+/[^/]+/issues/(?P<num>\d+)\)')
-NOTEBOOK_LINE_RE = re.compile(r'^\s*\[\[(?P<path>notebooks/[^\]]+\.ipynb)\]\]"?\]')
 CHECKLIST_CHILD = re.compile(r'^- \[(?: |x|X)\] #(\d+)', re.MULTILINE)
-SUB_ISSUE_HEADING_RE = re.compile(r'^### Sub-issue #(\d+):')
+SUB_ISSUE_HEADING_RE = re.compile(r'^[ \t]*### Sub-issue #(\d+):', re.MULTILINE)
+OVERVIEW_HEADING_RE = re.compile(r'^[ \t]*## Sub-Issues Overview[ \t]*$', re.MULTILINE)
 
 
 @dataclass
@@ -87,49 +106,87 @@ class ParentMapping:
     notebook_path: str
 
 
-def parse_outline(outline_text: str) -> List[ParentMapping]:
-    lines = outline_text.splitlines()
-    mappings: List[ParentMapping] = []
-    for i, line in enumerate(lines):
-        m = PARENT_ISSUE_RE.match(line)
-        if not m:
-            continue
-        if i + 1 >= len(lines):
-            continue
-        m2 = NOTEBOOK_LINE_RE.match(lines[i + 1].strip())
-        if not m2:
-            continue
-        issue_number = int(m.group('num'))
-        nb_path = m2.group('path')
-        mappings.append(ParentMapping(issue_number, nb_path))
-    return mappings
+def parse_outline(records: List[Dict[str, str]]) -> List[ParentMapping]:
+    return [ParentMapping(int(m['num']), m['path'])
+            for m in records if m['path'].startswith('notebooks/')]
+
+
+def throttle(r: requests.Response):
+    remaining = r.headers.get('X-RateLimit-Remaining')
+    reset = r.headers.get('X-RateLimit-Reset')
+    if remaining is not None and reset is not None and int(remaining) < RATE_LOW_WATER:
+        wait = int(reset) - time.time() + 1
+        if wait > 0:
+            sys.stderr.write(f'Rate limit low ({remaining} left); sleeping {wait:.0f}s\n')
+            time.sleep(wait)
+
+
+# number -> issue for the whole run; children shared by several parents are fetched once
+_issues: Dict[int, Dict] = {}
 
 
 def fetch_issue(number: int) -> Optional[Dict]:
-    r = requests.get(f'https://api.github.com/repos/{REPO_NAME}/issues/{number}', headers=HEADERS, timeout=30)
-    if r.status_code != 200:
+    if number in _issues:
+        return _issues[number]
+    # ETag-revalidated against the on-disk cache; a 304 costs no primary rate limit
+    r, issue = get_issue_cached(SESSION, REPO_NAME, number)
+    throttle(r)
+    if issue is None:
         sys.stderr.write(f'WARN: fetch issue #{number} failed: {r.status_code}\n')
-        return None
-    return r.json()
+    else:
+        _issues[number] = issue
+    return issue
+
+
+def _query_issue_batch(numbers: List[int]) -> Dict:
+    fields = ' '.join(f'i{n}: issue(number:{n}){{ number title body state url }}' for n in numbers)
+    q = f'query($o:String!,$n:String!){{ repository(owner:$o,name:$n){{ {fields} }} }}'
+    r = SESSION.post(GQL_ENDPOINT, json={'query': q, 'variables': {'o': OWNER, 'n': NAME}}, timeout=60)
+    throttle(r)
+    data = r.json()
+    repo = (data.get('data') or {}).get('repository')
+    if repo is None:
+        raise RuntimeError(data.get('errors') or f'status {r.status_code}')
+    return repo
 
 
 def fetch_issues(numbers: List[int]) -> Dict[int, Dict]:
-    result: Dict[int, Dict] = {}
-    for n in numbers:
-        issue = fetch_issue(n)
-        if issue:
-            result[n] = issue
-    return result
+    """Fill the run-wide memo with one aliased GraphQL query per GQL_BATCH unseen numbers."""
+    missing = [n for n in dict.fromkeys(numbers) if n not in _issues]
+    for start in range(0, len(missing), GQL_BATCH):
+        chunk = missing[start:start + GQL_BATCH]
+        try:
+            repo = _query_issue_batch(chunk)
+        except Exception as e:
+            sys.stderr.write(f'WARN: GraphQL issue batch failed ({e}); falling back to REST\n')
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+                list(pool.map(fetch_issue, chunk))  # fetch_issue fills _issues
+            continue
+        for n in chunk:
+            issue = repo.get(f'i{n}')
+            if not issue:
+                sys.stderr.write(f'WARN: fetch issue #{n} failed: not found\n')
+                continue
+            issue['state'] = issue['state'].lower()  # REST spelling, as shown in notebooks
+            _issues[n] = issue
+    return {n: _issues[n] for n in numbers if n in _issues}
+
+
+def child_numbers_for(issue: Dict) -> List[int]:
+    child_nums = extract_child_numbers(issue.get('body') or '')
+    return child_nums[:MAX_SUBISSUES] if MAX_SUBISSUES else child_nums
+
+
+def fetch_parent_bundle(numbers: List[int]) -> Dict[int, Dict]:
+    """Parents in one batched pass, then every checklist child across all parents in a second."""
+    parents = fetch_issues(numbers)
+    fetch_issues([cn for issue in parents.values() for cn in child_numbers_for(issue)])
+    return _issues
 
 
 def extract_child_numbers(parent_body: str) -> List[int]:
-    nums = []
-    for m in CHECKLIST_CHILD.finditer(parent_body or ''):
-        try:
-            nums.append(int(m.group(1)))
-        except ValueError:
-            pass
-    return nums
+    # one capture group of \d+: findall hands back digit strings, int() cannot fail
+    return list(map(int, CHECKLIST_CHILD.findall(parent_body or '')))
 
 
 def sanitize_description(body: str) -> str:
@@ -153,6 +210,30 @@ def sanitize_description(body: str) -> str:
     return text
 
 
+def new_cell_id() -> str:
+    # 8 hex chars straight from urandom; no UUID object built and mostly discarded
+    return os.urandom(4).hex()
+
+
+def md_cell(source: List[str]) -> Dict:
+    return {"id": new_cell_id(), "cell_type": "markdown", "metadata": {"language": "markdown"}, "source": source}
+
+
+def code_cell(source: List[str]) -> Dict:
+    return {"id": new_cell_id(), "cell_type": "code", "execution_count": None, "metadata": {"language": "python"}, "outputs": [], "source": source}
+
+
+def subissue_cells(ch: Dict) -> List[Dict]:
+    """Section heading cell (+ optional code placeholder) for one sub-issue; lines built directly."""
+    cnum = ch.get('number')
+    curl = ch.get('html_url') or ch.get('url')
+    cells = [md_cell([f"### Sub-issue #{cnum}: {ch.get('title')}", '', f"Link: [#{cnum}]({curl})",
+                      '', f"Status: {ch.get('state')}", '', "Implementation Notes:"])]  # placeholder
+    if INCLUDE_CODE_PLACEHOLDERS:
+        cells.append(code_cell([f'# TODO: code / experiments for sub-issue #{cnum}']))
+    return cells
+
+
 def build_notebook_json(parent_issue: Dict, child_issues: List[Dict]) -> Dict:
     title = parent_issue.get('title', '(No Title)')
     number = parent_issue.get('number')
@@ -160,32 +241,16 @@ def build_notebook_json(parent_issue: Dict, child_issues: List[Dict]) -> Dict:
     state = parent_issue.get('state')
     description = sanitize_description(parent_issue.get('body') or '')
 
-    def new_id() -> str:
-        return uuid.uuid4().hex[:8]
-
-    def md_cell(text: str) -> Dict:
-        return {"id": new_id(), "cell_type": "markdown", "metadata": {"language": "markdown"}, "source": text.splitlines()}
-
-    def code_cell(text: str = '') -> Dict:
-        return {"id": new_id(), "cell_type": "code", "execution_count": None, "metadata": {"language": "python"}, "outputs": [], "source": text.splitlines()}
-
     cells: List[Dict] = []
     header_lines = [f"# {title}", '', f"Parent Issue: [#{number}]({url})", f"Status: {state}"]
-    cells.append(md_cell('\n'.join(header_lines)))
+    cells.append(md_cell(header_lines))
     if description:
-        cells.append(md_cell(description))
+        cells.append(md_cell(description.splitlines()))
 
     if child_issues:
-        cells.append(md_cell('## Sub-Issues Overview'))
+        cells.append(md_cell(['## Sub-Issues Overview']))
     for ch in child_issues:
-        cnum = ch.get('number')
-        curl = ch.get('html_url') or ch.get('url')
-        ctitle = ch.get('title')
-        cstate = ch.get('state')
-        section_md = f"### Sub-issue #{cnum}: {ctitle}\n\nLink: [#{cnum}]({curl})\n\nStatus: {cstate}\n\nImplementation Notes:"  # placeholder
-        cells.append(md_cell(section_md))
-        if INCLUDE_CODE_PLACEHOLDERS:
-            cells.append(code_cell('# TODO: code / experiments for sub-issue #' + str(cnum)))
+        cells.extend(subissue_cells(ch))
 
     nb = {
         "cells": cells,
@@ -201,7 +266,7 @@ def build_notebook_json(parent_issue: Dict, child_issues: List[Dict]) -> Dict:
 
 def load_existing_notebook(path: Path) -> Optional[Dict]:
     try:
-        data = json.loads(path.read_text(encoding='utf-8'))
+        data = (orjson or json).loads(path.read_bytes())
         if not isinstance(data, dict):
             return None
         if 'cells' not in data or not isinstance(data['cells'], list):
@@ -231,21 +296,23 @@ def load_existing_notebook(path: Path) -> Optional[Dict]:
         return None
 
 
-def extract_existing_subissue_numbers(nb: Dict) -> set:
-    existing = set()
+def markdown_text(nb: Dict) -> str:
+    """All markdown cell sources as one string, for single-pass regex scans."""
+    parts: List[str] = []
     for cell in nb.get('cells', []):
         if cell.get('cell_type') != 'markdown':
             continue
-        lines = cell.get('source') or []
-        for line in lines:
-            if isinstance(line, str):
-                m = SUB_ISSUE_HEADING_RE.match(line.strip())
-                if m:
-                    try:
-                        existing.add(int(m.group(1)))
-                    except ValueError:
-                        pass
-    return existing
+        src = cell.get('source') or []
+        # our cells store lines without '\n', nbformat's keep it: join on '\n' for both
+        parts.append(src if isinstance(src, str) else '\n'.join(l for l in src if isinstance(l, str)))
+    return '\n'.join(parts)
+
+
+def extract_existing_subissue_numbers(nb: Dict) -> Tuple[Set[int], bool]:
+    """(sub-issue numbers with a section, whether the overview heading exists) from one walk."""
+    text = markdown_text(nb)
+    nums = {int(m.group(1)) for m in SUB_ISSUE_HEADING_RE.finditer(text)}
+    return nums, OVERVIEW_HEADING_RE.search(text) is not None
 
 
 def update_header_cell(nb: Dict, parent_issue: Dict):
@@ -265,77 +332,75 @@ def update_header_cell(nb: Dict, parent_issue: Dict):
     if not existing_lines or existing_lines[0] != desired_header[0] or REFRESH_STATUS:
         first['source'] = desired_header
     if 'id' not in first:
-        first['id'] = uuid.uuid4().hex[:8]
+        first['id'] = new_cell_id()
 
 
 def ensure_cell_ids(nb: Dict) -> int:
     changed = 0
     for cell in nb.get('cells', []):
         if 'id' not in cell:
-            cell['id'] = uuid.uuid4().hex[:8]
+            cell['id'] = new_cell_id()
             changed += 1
     return changed
 
 
 def append_new_subissue_sections(nb: Dict, parent_issue: Dict, child_issues: List[Dict]):
-    existing_nums = extract_existing_subissue_numbers(nb)
+    existing_nums, has_overview = extract_existing_subissue_numbers(nb)
     to_add = [ci for ci in child_issues if ci.get('number') not in existing_nums]
     if not to_add:
         return 0
-    def new_id() -> str:
-        return uuid.uuid4().hex[:8]
-    def md_cell(text: str) -> Dict:
-        return {"id": new_id(), "cell_type": "markdown", "metadata": {"language": "markdown"}, "source": text.splitlines()}
-    def code_cell(text: str = '') -> Dict:
-        return {"id": new_id(), "cell_type": "code", "execution_count": None, "metadata": {"language": "python"}, "outputs": [], "source": text.splitlines()}
     # Ensure there is a '## Sub-Issues Overview' section; add if missing
-    has_overview = any(
-        cell.get('cell_type') == 'markdown' and any(isinstance(line,str) and line.strip() == '## Sub-Issues Overview' for line in cell.get('source', []))
-        for cell in nb.get('cells', [])
-    )
     if to_add and not has_overview:
-        nb['cells'].append(md_cell('## Sub-Issues Overview'))
+        nb['cells'].append(md_cell(['## Sub-Issues Overview']))
     for ch in to_add:
-        cnum = ch.get('number')
-        curl = ch.get('html_url') or ch.get('url')
-        ctitle = ch.get('title')
-        cstate = ch.get('state')
-        section_md = f"### Sub-issue #{cnum}: {ctitle}\n\nLink: [#{cnum}]({curl})\n\nStatus: {cstate}\n\nImplementation Notes:"
-        nb['cells'].append(md_cell(section_md))
-        if INCLUDE_CODE_PLACEHOLDERS:
-            nb['cells'].append(code_cell('# TODO: code / experiments for sub-issue #' + str(cnum)))
+        nb['cells'].extend(subissue_cells(ch))
     return len(to_add)
 
 
+def dump_notebook(nb: Dict) -> bytes:
+    """Two-space indented JSON plus trailing newline, the layout Jupyter/VS Code write."""
+    if orjson is not None:
+        return orjson.dumps(nb, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    # ensure_ascii=False: raw UTF-8 like orjson, so output never depends on which is installed
+    return (json.dumps(nb, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+
+
 def write_notebook(path: Path, nb: Dict):
     if DRY_RUN:
         sys.stderr.write(f'DRY_RUN: would write {path}\n')
         return
+    data = dump_notebook(nb)
+    try:
+        if path.read_bytes() == data:  # keep mtime (and git status) untouched
+            sys.stderr.write(f'NO-WRITE (identical content): {path}\n')
+            return
+    except OSError:
+        pass
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(nb, indent=2) + '\n', encoding='utf-8')
+    # atomic swap: an interrupted run leaves the old notebook intact, never a truncated one
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
 
 def main():
     if not OUTLINE_FILE.exists():
         sys.stderr.write(f'ERROR: outline file not found: {OUTLINE_FILE}\n')
         sys.exit(2)
-    outline_text = OUTLINE_FILE.read_text(encoding='utf-8')
-    mappings = parse_outline(outline_text)
+    mappings = parse_outline(outline_nodes(OUTLINE_FILE))
     sys.stderr.write(f'Found {len(mappings)} parent mappings in outline.\n')
+    if ONLY_ISSUES:
+        by_num = {mp.issue_number: mp for mp in mappings}
+        missing = sorted(ONLY_ISSUES - by_num.keys())
+        if missing:
+            sys.stderr.write(f'WARN: ONLY_ISSUES not in outline: {missing}\n')
+        mappings = [by_num[n] for n in sorted(ONLY_ISSUES) if n in by_num]
+    bundle = fetch_parent_bundle([mp.issue_number for mp in mappings])
     for mp in mappings:
-        if ONLY_ISSUES and mp.issue_number not in ONLY_ISSUES:
-            continue
-        issue = fetch_issue(mp.issue_number)
+        issue = bundle.get(mp.issue_number)
         if not issue:
             continue
-        child_nums = extract_child_numbers(issue.get('body') or '')
-        if MAX_SUBISSUES:
-            child_nums = child_nums[:MAX_SUBISSUES]
-        child_issues = []
-        for cn in child_nums:
-            ch = fetch_issue(cn)
-            if ch:
-                child_issues.append(ch)
+        child_issues = [bundle[cn] for cn in child_numbers_for(issue) if cn in bundle]
         nb_path = ROOT / mp.notebook_path
         if nb_path.exists():
             if OVERWRITE:
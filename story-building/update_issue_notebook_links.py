@@ -8,7 +8,7 @@ Script actions:
  1. Parse `outline.md` mermaid diagram; collect (node_id, issue_number, notebook_path, issue_url).
  2. For each issue, fetch current body.
  3. If the notebook path already appears in the body (substring match), skip.
- 4. Else append or update a Notebook section:
+ 4. Else append or update a Notebook section (all changed bodies saved in batched GraphQL updateIssue mutations):
         ### Notebook\n
         - [ontology_load_and_query.ipynb](notebooks/ontology_load_and_query.ipynb)
     (If the section header already exists, add link under it if missing.)
@@ -20,6 +20,7 @@ Environment variables:
   NOTEBOOK_SECTION_HEADER         default: ### Notebook
   DRY_RUN=1                       preview only, no writes
   ONLY_ISSUES=comma separated     restrict processing to these issue numbers
+  FETCH_WORKERS                   default: 8 concurrent issue fetches
 
 Idempotency:
   - Re-runs will not duplicate links (substring and exact line checks)
@@ -34,14 +35,21 @@ from __future__ import annotations
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Set
+from typing import List, Optional, Dict, Set, Tuple
 from pathlib import Path
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from _outline_parse import outline_nodes
+from _issue_cache import get_issue as get_issue_cached
 
 ROOT = Path(__file__).resolve().parents[1]
-load_dotenv(ROOT / '.env')
+if not (os.environ.get('GITHUB_TOKEN') or os.environ.get('GITHUB_TOKEN_FG')):
+    # token already injected (CI): skip importing dotenv and reading .env
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / '.env')
 
 USERNAME = os.getenv('USERNAME', 'alexanderwiebe')
 TOKEN = os.getenv('GITHUB_TOKEN') or os.getenv('GITHUB_TOKEN_FG')
@@ -49,6 +57,13 @@ OUTLINE_FILE = Path(os.getenv('OUTLINE_FILE', 'outline.md'))
 NOTEBOOK_SECTION_HEADER = os.getenv('NOTEBOOK_SECTION_HEADER', '### Notebook')
 DRY_RUN = os.getenv('DRY_RUN') == '1'
 VERBOSE = os.getenv('VERBOSE') == '1'
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '8'))
+RATE_LOW_WATER = 50  # below this many remaining calls, sleep until the window resets
+GQL_ENDPOINT = 'https://api.github.com/graphql'
+UPDATE_BATCH = 20  # aliased updateIssue mutations per GraphQL request
+# \r? before $ / \n: bodies edited on the GitHub web UI use CRLF line endings
+SECTION_HEADER_RE = re.compile(r'^[ \t]*' + re.escape(NOTEBOOK_SECTION_HEADER) + r'[ \t]*\r?$', re.MULTILINE)
+LINK_BLOCK_RE = re.compile(r'(?:\r?\n[ \t]*- \[[^\r\n]*)*')  # run of '- [' lines right after the header
 
 ONLY_ISSUES_ENV = os.getenv('ONLY_ISSUES')
 ONLY_ISSUES: Set[int] = set()
@@ -67,6 +82,10 @@ REST_HEADERS = {
     'Authorization': f'token {TOKEN}',
     'Accept': 'application/vnd.github+json'
 }
+# Shared keep-alive session: TLS is negotiated once per pooled connection
+SESSION = requests.Session()
+SESSION.headers.update(REST_HEADERS)
+SESSION.mount('https://', HTTPAdapter(pool_maxsize=FETCH_WORKERS))
 
 
 @dataclass
@@ -75,104 +94,137 @@ class NodeLink:
     issue_number: int
     issue_url: str
     notebook_path: str
+    link_line: str  # '- [<file>.ipynb](<path>)', built once at parse time
 
 
-ISSUE_LINE_RE = re.compile(r'^(?P<indent>\s*)(?P<node>P\w+)\["- \[[ x]\] \[[^\]]+\]\(https://github.com/[^/]+/[^/]+/issues/(?P<num>\d+)\).*')
-NOTEBOOK_LINE_RE = re.compile(r'^\s*\[\[([^\]]+\.ipynb)\]\]"\]')
+def parse_outline(records: List[Dict[str, str]]) -> List[NodeLink]:
+    return [NodeLink(node_id=m['node'], issue_number=int(m['num']),
+                     issue_url=m['url'], notebook_path=m['path'],
+                     link_line=f"- [{m['path'].rsplit('/', 1)[-1]}]({m['path']})")
+            for m in records]
 
 
-def parse_outline(outline_text: str) -> List[NodeLink]:
-    lines = outline_text.splitlines()
-    results: List[NodeLink] = []
-    for i, line in enumerate(lines):
-        m = ISSUE_LINE_RE.match(line)
-        if not m:
-            continue
-        if i + 1 >= len(lines):
-            continue
-        next_line = lines[i + 1]
-        m2 = NOTEBOOK_LINE_RE.match(next_line.strip())
-        if not m2:
-            continue
-        issue_number = int(m.group('num'))
-        node_id = m.group('node')
-        # Extract issue URL from the full matched part by re-search
-        url_match = re.search(r'(https://github.com/[^)]+/issues/\d+)', line)
-        if not url_match:
-            continue
-        issue_url = url_match.group(1)
-        notebook_path = m2.group(1)
-        results.append(NodeLink(node_id=node_id, issue_number=issue_number, issue_url=issue_url, notebook_path=notebook_path))
-    return results
+def throttle(r: requests.Response):
+    remaining = r.headers.get('X-RateLimit-Remaining')
+    reset = r.headers.get('X-RateLimit-Reset')
+    if remaining is not None and reset is not None and int(remaining) < RATE_LOW_WATER:
+        wait = int(reset) - time.time() + 1
+        if wait > 0:
+            sys.stderr.write(f'Rate limit low ({remaining} left); sleeping {wait:.0f}s\n')
+            time.sleep(wait)
 
 
 def fetch_issue(number: int) -> Optional[Dict]:
-    r = requests.get(f'https://api.github.com/repos/{REPO_NAME}/issues/{number}', headers=REST_HEADERS, timeout=30)
-    if r.status_code != 200:
+    # ETag-revalidated against the on-disk cache; a 304 costs no primary rate limit
+    r, issue = get_issue_cached(SESSION, REPO_NAME, number)
+    throttle(r)
+    if issue is None:
         sys.stderr.write(f'WARN: fetch issue #{number} failed: {r.status_code}\n')
-        return None
-    return r.json()
+    return issue
 
 
 def patch_issue(number: int, body: str) -> bool:
     if DRY_RUN:
         return True
-    r = requests.patch(f'https://api.github.com/repos/{REPO_NAME}/issues/{number}', headers=REST_HEADERS, json={'body': body}, timeout=30)
+    r = SESSION.patch(f'https://api.github.com/repos/{REPO_NAME}/issues/{number}', json={'body': body}, timeout=30)
+    throttle(r)
     if r.status_code not in (200, 201):
         sys.stderr.write(f'ERROR: patch issue #{number} failed: {r.status_code} {r.text[:120]}\n')
         return False
     return True
 
 
-def ensure_notebook_section(body: str, notebook_path: str) -> str:
+def update_issue_bodies(edits: Dict[int, Tuple[str, str]]) -> Set[int]:
+    """Save {number: (node_id, body)} via aliased updateIssue mutations; returns numbers saved."""
+    if DRY_RUN:
+        return set(edits)
+    saved: Set[int] = set()
+    items = list(edits.items())
+    for start in range(0, len(items), UPDATE_BATCH):
+        chunk = items[start:start + UPDATE_BATCH]
+        decls = ','.join(f'$i{k}:ID!,$b{k}:String!' for k in range(len(chunk)))
+        fields = ' '.join(f'u{k}: updateIssue(input:{{id:$i{k},body:$b{k}}}){{ issue {{ number }} }}'
+                          for k in range(len(chunk)))
+        variables: Dict[str, str] = {}
+        for k, (_, (node_id, body)) in enumerate(chunk):
+            variables[f'i{k}'] = node_id
+            variables[f'b{k}'] = body
+        try:
+            r = SESSION.post(GQL_ENDPOINT, json={'query': f'mutation({decls}){{ {fields} }}',
+                                                 'variables': variables}, timeout=60)
+            throttle(r)
+            data = r.json()
+        except Exception as e:
+            sys.stderr.write(f'WARN: GraphQL update batch failed ({e}); falling back to REST\n')
+            saved.update(num for num, (_, body) in chunk if patch_issue(num, body))
+            continue
+        for err in data.get('errors') or []:
+            sys.stderr.write(f'ERROR: updateIssue: {err.get("message")}\n')
+        results = data.get('data') or {}
+        for k, (num, _) in enumerate(chunk):
+            if results.get(f'u{k}'):
+                saved.add(num)
+    return saved
+
+
+def ensure_notebook_section(body: str, link_line: str) -> str:
     # Even if path appears, ensure it's within a proper section; if not, we'll still add section.
-    path_present = notebook_path in body
-    lines = body.splitlines()
-    header_indices = [i for i, l in enumerate(lines) if l.strip() == NOTEBOOK_SECTION_HEADER]
-    link_line = f'- [{os.path.basename(notebook_path)}]({notebook_path})'
-    if header_indices:
-        idx = header_indices[0]
-        # Scan existing links under header
-        insert_at = idx + 1
-        while insert_at < len(lines) and lines[insert_at].strip().startswith('- ['):
-            if lines[insert_at].strip() == link_line:
-                # Already properly linked
-                return body
-            insert_at += 1
+    nl = '\r\n' if '\r\n' in body else '\n'  # new lines follow the body's own line endings
+    header = SECTION_HEADER_RE.search(body)
+    if header:
+        # One anchored regex match spans the link lines under the header; the body is never split
+        block = LINK_BLOCK_RE.match(body, header.end())
+        if any(l.strip() == link_line for l in block.group().split('\n')):
+            # Already properly linked
+            return body
+        cursor = block.end()
         # If path present elsewhere but not linked under header, still add link
-        lines.insert(insert_at, link_line)
-        return '\n'.join(lines).rstrip() + '\n'
+        return (body[:cursor] + nl + link_line + body[cursor:]).rstrip() + nl
     # Append new section
-    if lines and lines[-1].strip() != '':
-        lines.append('')
-    lines.append(NOTEBOOK_SECTION_HEADER)
-    lines.append(link_line)
-    return '\n'.join(lines).rstrip() + '\n'
+    head = body.rstrip()
+    return (head + nl + nl if head else '') + NOTEBOOK_SECTION_HEADER + nl + link_line + nl
 
 
 def main():
     if not OUTLINE_FILE.exists():
         sys.stderr.write(f'ERROR: outline file not found: {OUTLINE_FILE}\n')
         sys.exit(2)
-    outline_text = OUTLINE_FILE.read_text(encoding='utf-8')
-    nodes = parse_outline(outline_text)
+    nodes = parse_outline(outline_nodes(OUTLINE_FILE))
     sys.stderr.write(f'Parsed nodes with issues: {len(nodes)}\n')
     updated = 0
     skipped = 0
+    if ONLY_ISSUES:
+        by_num: Dict[int, List[NodeLink]] = {}  # an issue may back several outline nodes
+        for n in nodes:
+            by_num.setdefault(n.issue_number, []).append(n)
+        missing = sorted(ONLY_ISSUES - by_num.keys())
+        if missing:
+            sys.stderr.write(f'WARN: ONLY_ISSUES not in outline: {missing}\n')
+        nodes = [n for num in sorted(ONLY_ISSUES) for n in by_num.get(num, [])]
+    # fetches overlap (each issue once, even if several nodes share it)
+    numbers = list(dict.fromkeys(n.issue_number for n in nodes))
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        issues = dict(zip(numbers, pool.map(fetch_issue, numbers)))
+    edits: Dict[int, Tuple[str, str]] = {}  # number -> (node id, final body)
+    changed: List[NodeLink] = []
     for node in nodes:
-        if ONLY_ISSUES and node.issue_number not in ONLY_ISSUES:
-            continue
-        issue = fetch_issue(node.issue_number)
+        issue = issues.get(node.issue_number)
         if not issue:
             continue
         body = issue.get('body') or ''
-        new_body = ensure_notebook_section(body, node.notebook_path)
+        new_body = ensure_notebook_section(body, node.link_line)
         if new_body == body:
             skipped += 1
             if VERBOSE:
                 sys.stderr.write(f'SKIP #{node.issue_number}: {node.notebook_path} already linked or present.\n')
             continue
-        if patch_issue(node.issue_number, new_body):
+        issue['body'] = new_body  # a later node for the same issue builds on this edit
+        edits[node.issue_number] = (issue['node_id'], new_body)
+        changed.append(node)
+    # every changed body goes out together: one request per UPDATE_BATCH issues
+    saved = update_issue_bodies(edits)
+    for node in changed:
+        if node.issue_number in saved:
             updated += 1
             sys.stderr.write(f'Updated issue #{node.issue_number} with notebook {node.notebook_path}\n')
         elif VERBOSE:
@@ -0,0 +1,97 @@
+"""Update outline.md in one pass: issue links, checkbox state and sub-issue progress.
+
+The only entrypoint for the outline passes (_outline_links.py, _outline_progress.py):
+  1. Fetch project issues (title -> url/state/body)
+  2. Read outline.md once; the link pass rewrites the whole text with one multiline regex
+  3. Fetch only the issues the linked text references plus their sub-issues (number ->
+     state/body), reusing what the project fetch already returned; every line then flows
+     through the progress pass, which sees the freshly linked titles
+  4. Refresh the mermaid click directives
+  5. Write the file once, and only if its content changed
+
+Environment variables: the union of both scripts' (GITHUB_TOKEN / GITHUB_TOKEN_FG, USERNAME,
+PROJECT_NUMBER, OUTLINE_FILE, DRY_RUN=1, INCLUDE_ZERO=1).
+
+Usage:
+  DRY_RUN=1 python story-building/update_outline.py
+  python story-building/update_outline.py
+  python story-building/update_outline.py --links-only      # or update_outline_links.py
+  python story-building/update_outline.py --progress-only   # or update_outline_progress.py
+"""
+
+from __future__ import annotations
+import os
+import sys
+from typing import Any, Dict, List
+import _outline_links as links
+import _outline_progress as progress
+
+OUTLINE_FILE = links.OUTLINE_FILE
+DRY_RUN = links.DRY_RUN
+
+
+def run(link: bool = True, annotate: bool = True):
+    """Run the enabled passes over a single read and a single write of the outline."""
+    issues_by_title: Dict[str, Dict[str, Any]] = {}
+    issue_map: Dict[int, dict] = {}
+    try:
+        if link:
+            issues_by_title = {it['title']: it for it in links.fetch_project_issues()}
+            sys.stderr.write(f'Issues loaded: {len(issues_by_title)}\n')
+    except Exception as e:
+        sys.stderr.write(f'ERROR fetching issues: {e}\n')
+        sys.exit(2)
+    try:
+        text = original = links.load_outline()
+    except Exception as e:
+        sys.stderr.write(f'ERROR reading outline: {e}\n')
+        sys.exit(2)
+    node_click_map: Dict[str, Dict[str, str]] = {}
+    if link:
+        text = links.link_text(text, issues_by_title, node_click_map)
+    if annotate:
+        known = {it['number']: {'number': it['number'], 'state': (it.get('state') or '').lower(),
+                                'body': it.get('body'), 'updatedAt': it.get('updatedAt')}
+                 for it in issues_by_title.values()}
+        try:
+            issue_map = progress.fetch_outline_issues(text, known)
+        except Exception as e:
+            sys.stderr.write(f'ERROR fetching issues: {e}\n')
+            sys.exit(2)
+    new_lines = text.splitlines()
+    if annotate:
+        new_lines = list(progress.annotate_lines(new_lines, issue_map))
+    if link:
+        # Inject / refresh mermaid click directives inside the mermaid block
+        try:
+            new_lines = links.inject_click_directives(new_lines, node_click_map)
+        except Exception as e:
+            sys.stderr.write(f'WARNING: failed to inject click directives: {e}\n')
+    if DRY_RUN:
+        sys.stderr.write(
+            'DRY_RUN=1; not writing changes. Preview below (first 60 lines if long):\n')
+        print('\n'.join(new_lines[:60]))
+        return
+    new_text = ''.join(ln + '\n' for ln in new_lines)
+    if new_text == original:
+        # no touch: git status, editors and file watchers see nothing
+        sys.stderr.write('No changes; skipping write\n')
+        return
+    # temp file + atomic swap: a failed write never leaves a truncated outline
+    tmp = OUTLINE_FILE.with_suffix(OUTLINE_FILE.suffix + '.tmp')
+    tmp.write_text(new_text, encoding='utf-8')
+    os.replace(tmp, OUTLINE_FILE)
+    sys.stderr.write(f'Updated file written: {OUTLINE_FILE}\n')
+
+
+def main(argv: List[str] | None = None):
+    args = sys.argv[1:] if argv is None else argv
+    unknown = [a for a in args if a not in ('--links-only', '--progress-only')]
+    if unknown or len(args) > 1:
+        sys.stderr.write('usage: update_outline.py [--links-only | --progress-only]\n')
+        sys.exit(2)
+    run(link='--progress-only' not in args, annotate='--links-only' not in args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ Test script to verify emmontopy installation and load the relationship ontology
 """
 
 import sys
+import operator
 from pathlib import Path
 
 try:
@@ -15,6 +16,18 @@ except ImportError as e:
     print(f"✗ Failed to import emmopy: {e}")
     sys.exit(1)
 
+BY_NAME = operator.attrgetter('name')  # C-level sort key
+
+
+def label_suffix(entity):
+    label = getattr(entity, 'label', [])
+    return f" ({label[0]})" if label else ""
+
+
+def names(entities, skip=None):
+    # identity test: owlready2 equality can hit the triple store
+    return [e.name for e in entities if e is not skip and hasattr(e, 'name')]
+
 
 def test_ontology():
     """Load and analyze the relationship ontology"""
@@ -43,44 +56,34 @@ def test_ontology():
 
         # Get classes
         print(f"\n🏷️  Classes:")
-        classes = list(onto.classes())
+        classes = sorted(onto.classes(), key=BY_NAME)
         if classes:
-            for cls in sorted(classes, key=lambda x: x.name):
-                # Get label if available
-                label = getattr(cls, 'label', [])
-                label_str = f" ({label[0]})" if label else ""
-
+            for cls in classes:
                 # Get superclasses
-                superclasses = [sc.name for sc in cls.is_a if hasattr(
-                    sc, 'name') and sc != cls]
+                superclasses = names(cls.is_a, skip=cls)
                 super_str = f" ⊑ {', '.join(superclasses)}" if superclasses else ""
 
-                print(f"   • {cls.name}{label_str}{super_str}")
+                print(f"   • {cls.name}{label_suffix(cls)}{super_str}")
         else:
             print("   No classes found")
 
         # Get object properties
         print(f"\n🔗 Object Properties:")
-        object_properties = list(onto.object_properties())
+        object_properties = sorted(onto.object_properties(), key=BY_NAME)
         if object_properties:
-            for prop in sorted(object_properties, key=lambda x: x.name):
-                # Get label if available
-                label = getattr(prop, 'label', [])
-                label_str = f" ({label[0]})" if label else ""
-
+            for prop in object_properties:
                 # Get domain and range
                 domain = getattr(prop, 'domain', [])
                 range_prop = getattr(prop, 'range', [])
 
-                domain_str = f" Domain: {[d.name for d in domain if hasattr(d, 'name')]}" if domain else ""
-                range_str = f" Range: {[r.name for r in range_prop if hasattr(r, 'name')]}" if range_prop else ""
+                domain_str = f" Domain: {names(domain)}" if domain else ""
+                range_str = f" Range: {names(range_prop)}" if range_prop else ""
 
                 # Get superproperties
-                superprops = [sp.name for sp in prop.is_a if hasattr(
-                    sp, 'name') and sp != prop]
+                superprops = names(prop.is_a, skip=prop)
                 super_str = f" ⊑ {', '.join(superprops)}" if superprops else ""
 
-                print(f"   • {prop.name}{label_str}{super_str}")
+                print(f"   • {prop.name}{label_suffix(prop)}{super_str}")
                 if domain_str or range_str:
                     print(f"     {domain_str}{range_str}")
         else:
@@ -88,28 +91,23 @@ def test_ontology():
 
         # Get data properties
         print(f"\n📊 Data Properties:")
-        data_properties = list(onto.data_properties())
+        data_properties = sorted(onto.data_properties(), key=BY_NAME)
         if data_properties:
-            for prop in sorted(data_properties, key=lambda x: x.name):
-                label = getattr(prop, 'label', [])
-                label_str = f" ({label[0]})" if label else ""
-                print(f"   • {prop.name}{label_str}")
+            for prop in data_properties:
+                print(f"   • {prop.name}{label_suffix(prop)}")
         else:
             print("   No data properties found")
 
         # Get individuals
         print(f"\n👤 Individuals:")
-        individuals = list(onto.individuals())
+        individuals = sorted(onto.individuals(), key=BY_NAME)
         if individuals:
-            for ind in sorted(individuals, key=lambda x: x.name):
+            for ind in individuals:
                 # Get types
-                types = [t.name for t in ind.is_a if hasattr(t, 'name')]
+                types = names(ind.is_a)
                 type_str = f" : {', '.join(types)}" if types else ""
 
-                label = getattr(ind, 'label', [])
-                label_str = f" ({label[0]})" if label else ""
-
-                print(f"   • {ind.name}{label_str}{type_str}")
+                print(f"   • {ind.name}{label_suffix(ind)}{type_str}")
         else:
             print("   No individuals found")
 